@@ -18,11 +18,37 @@ MOUSE_DEADZONE = 0.5  # Reduced deadzone (was 1)
 ROTATE_SPEED = MOUSE_SENSITIVITY * 60
 FOV = math.pi / 3
 
+# Rendering settings
+WALL_KERNEL = "python"  # "python" (ray by ray) or "numpy" (whole frame at once, needs NumPy)
+RENDER_BACKEND = "surface"  # "surface" (column blits) or "buffer" (NumPy pixel buffer, one blit per frame)
+RESOLUTION_PRESETS = {"low": 320, "medium": 640, "high": 1280}  # Rays cast per frame (SCREEN_WIDTH must divide evenly)
+RESOLUTION_PRESET = "medium"
+DYNAMIC_RESOLUTION = True  # Lower the 3D view resolution when the frame rate drops below the target
+DYNAMIC_RESOLUTION_TARGET_FPS = 40
+DYNAMIC_RESOLUTION_STEPS = [(1.0, 1.0), (0.5, 1.0), (0.5, 0.75), (0.4, 0.5), (0.25, 0.5)]  # (fraction of the preset's rays, render scale), step 0 is the selected preset
+RENDER_WORKERS = 1  # Numpy wall kernel only: above 1 it casts (and the buffer backend draws) that many vertical bands in threads, serial on a single CPU
+SPRITE_SIZE_QUANTUM = 2  # Scaled sprite sizes are rounded to this many pixels (1 = exact size, fewer cache hits)
+SPRITE_CACHE_MAX_BYTES = 16 * 1024 * 1024  # Memory bound of the scaled sprite cache
+MIPMAPS = True  # Half-size chains of wall textures and enemy frames, distant ones are scaled from the nearest level
+MIP_MIN_SIZE = 4  # Smallest mip level, in pixels
+ATLAS_PAGE_SIZE = 1024  # Width (and maximum height) of the pages enemy frames are packed into
+ATLAS_CACHE_DIR = "cache/atlases"  # Packed pages and their frame index, rebuilt when the PNG change
+LEVEL_CACHE = True  # Parsed maps are compiled into a .lvc file next to the .tmx, reused while the .tmx is unchanged
+PVS_RAY_ANGLES = 360  # Rays cast from each sample point of a tile when building the visibility table
+PVS_RAY_STEP = 0.25  # Ray march step, in tiles
+
 # Level settings
 WALL_HEIGHT_SCALE = 1.7
 PLAYER_COLLISION_RADIUS = TILE_SIZE * 0.3
 PICKUP_SCALE = 0.8
 
+# AI settings
+FLOW_FIELD_RANGE = 64  # Path length, in tiles, over which enemies follow the flow field (straight line beyond)
+FLOW_FIELD_DOOR_COST = 4  # Extra cost of crossing a door that still blocks, in tiles
+AI_TIERS = [(600, 0), (1200, 15), (float("inf"), 10)]  # (up to distance, think rate in Hz, 0 = every frame), visible enemies use the first
+AI_FRAME_BUDGET_MS = 4.0  # Enemy updates past this time in a frame wait for the next one
+LOS_CACHE_MAX_ENTRIES = 65536  # Tile pairs the line-of-sight cache remembers, emptied when full
+
 # Gameplay settings
 WEAPON_SLOTS = {
     "chainsaw": 0,
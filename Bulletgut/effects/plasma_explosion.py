@@ -1,5 +1,5 @@
 import pygame as pg
-import math
+from engine.billboard import Billboard
 
 class PlasmaExplosion:
     def __init__(self, game, x, y):
@@ -21,32 +21,18 @@ class PlasmaExplosion:
         if elapsed >= self.duration:
             self.done = True
 
-    def render(self, screen, raycaster, player):
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
         if self.done:
-            return
+            return None
 
         elapsed = pg.time.get_ticks() / 1000 - self.start_time
         index = min(int((elapsed / self.duration) * len(self.frames)), len(self.frames) - 1)
         sprite = self.frames[index]
 
-        dx = self.x - player.x
-        dy = self.y - player.y
-        dist = math.hypot(dx, dy)
-        rel_angle = math.atan2(dy, dx) - player.angle
-        rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
-
-        if abs(rel_angle) > raycaster.fov / 2:
-            return
-
-        corrected_dist = dist * math.cos(rel_angle)
-        screen_x = int((0.5 + rel_angle / raycaster.fov) * screen.get_width())
+        size = max(60, int(800 / (depth + 0.0001)))
+        screen_y = view_height // 2 - size // 2
+        # Les colonnes de l'explosion derrière un mur ne sont pas dessinées
+        return Billboard(sprite, screen_x - size // 2, screen_y, size, size, depth, margin=10)
 
-        # Empêche le rendu si explosion derrière un mur
-        if 0 <= screen_x < len(raycaster.z_buffer):
-            if corrected_dist > raycaster.z_buffer[screen_x] + 10:
-                return
-
-        size = max(60, int(800 / (corrected_dist + 0.0001)))
-        screen_y = screen.get_height() // 2 - size // 2
-        scaled_sprite = pg.transform.scale(sprite, (size, size))
-        screen.blit(scaled_sprite, (screen_x - size // 2, screen_y))
+    def render(self, screen, raycaster, player):
+        raycaster.render_billboards(screen, player, [self])
@@ -0,0 +1,68 @@
+import time
+from data.config import AI_TIERS, AI_FRAME_BUDGET_MS
+
+
+class AIScheduler:
+    """Picks which enemies think this frame, by distance and visibility tier, within a time budget
+
+    Enemies the player can see (in view and PVS) or closer than the first tier think every frame, farther
+    ones at their tier's rate; an enemy is handed all the time it waited as dt, so it moves and
+    counts down its timers as if it had been updated every frame. Due enemies run most overdue
+    first until AI_FRAME_BUDGET_MS is spent, the rest keep waiting and go first next frame.
+    Dead enemies leave the update set once their death animation is over.
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.active = {}  # enemy -> [time waited since its last update, think interval], in seconds
+        self.deferred = 0  # Due enemies left for the next frame by the last update()
+        self.reset()
+
+    def reset(self):
+        """Every enemy of the level thinks on the next frame (level loaded or restarted)"""
+        self.active = {enemy: [0.0, 0.0] for enemy in self.level.enemies
+                       if not enemy.is_death_animation_finished()}
+
+    def get_interval(self, enemy, player):
+        """Seconds between two updates of an enemy, from its tier (reads this frame's perception pass)"""
+        slowest = 1.0 / AI_TIERS[-1][1]
+        if not enemy.alive:
+            return slowest  # Only the death animation left, which plays while drawing
+        perception = self.level.perception
+        index = enemy.perception_index
+        if perception.in_view[index] and self.level.pvs.is_visible(enemy.x, enemy.y, player.x, player.y):
+            return 0.0
+
+        distance = perception.distance[index]
+        for max_distance, rate in AI_TIERS:
+            if distance <= max_distance:
+                return 1.0 / rate if rate else 0.0
+        return slowest
+
+    def update(self, player, dt):
+        """Update the enemies due this frame, returns the ones that were updated"""
+        deadline = time.perf_counter() + AI_FRAME_BUDGET_MS / 1000
+        due = []
+        for enemy, timing in self.active.items():
+            timing[0] += dt
+            if timing[0] >= timing[1]:
+                due.append((timing[1] - timing[0], enemy))
+        due.sort(key=lambda entry: entry[0])
+
+        updated = []
+        self.deferred = 0
+        for index, (_, enemy) in enumerate(due):
+            if updated and time.perf_counter() >= deadline:
+                self.deferred = len(due) - index
+                break
+
+            if not enemy.alive and not enemy.just_died and enemy.is_death_animation_finished():
+                del self.active[enemy]
+                continue
+
+            timing = self.active[enemy]
+            enemy.update(player, timing[0])
+            timing[0] = 0.0
+            timing[1] = self.get_interval(enemy, player)
+            updated.append(enemy)
+        return updated
@@ -0,0 +1,58 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, billboards are then projected one by one
+    np = None
+
+
+class Billboard:
+    """One sprite to draw in the 3D view, before scaling and z-buffer clipping"""
+
+    __slots__ = ("sprite", "x", "y", "width", "height", "depth", "margin")
+
+    def __init__(self, sprite, x, y, width, height, depth, margin=0):
+        self.sprite = sprite  # Unscaled source frame
+        self.x = x  # Screen position of the top left corner of the scaled sprite
+        self.y = y
+        self.width = width
+        self.height = height
+        self.depth = depth  # Fisheye corrected distance, compared with the z-buffer
+        self.margin = margin  # Depth tolerance in front of walls (projectiles and explosions hugging a wall)
+
+
+def project_billboards(objects, player, fov, view_width):
+    """Project the position of every object in one step
+
+    Returns (object, distance, depth, screen_x) for the objects inside the field of view.
+    """
+    if not objects:
+        return []
+
+    ox, oy = player.get_position()
+    angle = player.get_angle()
+
+    if np is None:
+        projected = []
+        for obj in objects:
+            dx, dy = obj.x - ox, obj.y - oy
+            delta = (math.atan2(dy, dx) - angle + math.pi) % (2 * math.pi) - math.pi
+            if abs(delta) > fov / 2:
+                continue
+            distance = math.hypot(dx, dy)
+            projected.append((obj, distance, distance * math.cos(delta), int((0.5 + delta / fov) * view_width)))
+        return projected
+
+    positions = np.array([(obj.x, obj.y) for obj in objects], dtype=float)
+    dx = positions[:, 0] - ox
+    dy = positions[:, 1] - oy
+    delta = (np.arctan2(dy, dx) - angle + math.pi) % (2 * math.pi) - math.pi
+    inside = np.nonzero(np.abs(delta) <= fov / 2)[0]
+
+    delta = delta[inside]
+    distance = np.hypot(dx[inside], dy[inside])
+    depth = distance * np.cos(delta)
+    screen_x = ((0.5 + delta / fov) * view_width).astype(int)
+
+    return [(objects[index], dist, corrected, x) for index, dist, corrected, x
+            in zip(inside.tolist(), distance.tolist(), depth.tolist(), screen_x.tolist())]
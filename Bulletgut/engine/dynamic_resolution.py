@@ -0,0 +1,97 @@
+from data.config import (SCREEN_WIDTH, DYNAMIC_RESOLUTION, DYNAMIC_RESOLUTION_TARGET_FPS, DYNAMIC_RESOLUTION_STEPS,
+                         RESOLUTION_PRESETS)
+
+
+class DynamicResolution:
+    """Trades 3D view resolution for frame rate: fewer, wider rays and a shorter view when frames run long
+
+    Fed with the frame time measured by Game.update. Steps are (fraction of the preset's rays, render_scale),
+    best quality first: step 0 is the manually selected preset, which the controller never exceeds.
+    """
+
+    def __init__(self, raycaster, target_fps=DYNAMIC_RESOLUTION_TARGET_FPS, steps=DYNAMIC_RESOLUTION_STEPS,
+                 enabled=DYNAMIC_RESOLUTION):
+        self.raycaster = raycaster
+        self.target_fps = target_fps
+        self.steps = steps
+        self.enabled = enabled
+        self.step = 0
+        self.frame_time = None  # Smoothed frame time, in seconds
+        self.cooldown = 0.0
+
+        self.smoothing = 0.1  # Weight of the newest frame in the average
+        self.downgrade_delay = 0.5  # Seconds between two quality drops
+        self.upgrade_delay = 3.0  # Seconds of headroom before raising the quality again
+        self.upgrade_headroom = 0.75  # Frame time, as a fraction of the budget, that allows an upgrade
+        self.max_frame_time = 0.25  # Longer frames are loading hitches, not rendering load
+
+    def attach(self, raycaster):
+        """Follow a new raycaster (new level), keeping the selected preset and the current quality step"""
+        if raycaster.resolution_preset != self.raycaster.resolution_preset:
+            raycaster.set_resolution_preset(self.raycaster.resolution_preset)
+        self.raycaster = raycaster
+        if self.enabled:
+            self.apply()
+
+    def reset(self):
+        """Start again from step 0 of the current preset (a new preset was selected)"""
+        self.step = 0
+        self.frame_time = None
+        self.cooldown = 0.0
+        if self.enabled:
+            self.apply()
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        self.frame_time = None
+        self.step = 0
+        if enabled:
+            self.apply()
+        else:
+            # Back to the manually selected preset at full height
+            self.raycaster.set_resolution_preset(self.raycaster.resolution_preset)
+            self.raycaster.set_render_scale(1.0)
+        print(f"[RESOLUTION] Dynamic resolution {'on' if enabled else 'off'}")
+        return self.enabled
+
+    def update(self, dt):
+        if not self.enabled or dt <= 0 or dt > self.max_frame_time:
+            return
+
+        if self.frame_time is None:
+            self.frame_time = dt
+        else:
+            self.frame_time += (dt - self.frame_time) * self.smoothing
+
+        self.cooldown -= dt
+        if self.cooldown > 0:
+            return
+
+        budget = 1.0 / self.target_fps
+        if self.frame_time > budget and self.step < len(self.steps) - 1:
+            self.step += 1
+            self.apply()
+            self.cooldown = self.downgrade_delay
+        elif self.frame_time < budget * self.upgrade_headroom and self.step > 0:
+            self.step -= 1
+            self.apply()
+            self.cooldown = self.upgrade_delay
+
+    def get_num_rays(self, fraction):
+        """Ray count of a step: that fraction of the preset's rays, rounded down to a divisor of SCREEN_WIDTH"""
+        num_rays = max(1, int(RESOLUTION_PRESETS[self.raycaster.resolution_preset] * fraction))
+        while SCREEN_WIDTH % num_rays:
+            num_rays -= 1
+        return num_rays
+
+    def apply(self):
+        """Switch the raycaster to the current step (silently, steps change several times a second under load)"""
+        fraction, render_scale = self.steps[self.step]
+        num_rays = self.get_num_rays(fraction)
+        if self.raycaster.num_rays != num_rays:
+            self.raycaster.set_resolution(num_rays)
+        self.raycaster.set_render_scale(render_scale)
+
+    def get_quality(self):
+        fraction, render_scale = self.steps[self.step]
+        return self.get_num_rays(fraction), render_scale
@@ -0,0 +1,121 @@
+import heapq
+import math
+from array import array
+from data.config import TILE_SIZE, FLOW_FIELD_RANGE, FLOW_FIELD_DOOR_COST
+
+STRAIGHT_COST = 10
+DIAGONAL_COST = 14
+UNREACHED = 0x7FFFFFFF
+
+
+class FlowField:
+    """Path distance from every tile to the player's tile, shared by every chasing enemy
+
+    Dijkstra over the 8-connected walkable grid (diagonals only when both sides are open),
+    a blocking door costs FLOW_FIELD_DOOR_COST straight steps more than an open tile.
+    The field is only rebuilt when the player changes tiles or a door starts or stops blocking,
+    and stops FLOW_FIELD_RANGE tiles away. An enemy reads its next step with get_direction().
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.width = level.map_width
+        self.height = level.map_height
+        self.unreached = array("i", [UNREACHED]) * (self.width * self.height)
+        self.distance = array("i", self.unreached)
+        self.source = None
+        self.door_revision = None
+        self.rebuilds = 0
+
+        # Neighbours of each open tile: (tile, cost, side tile a, side tile b), sides -1 for straight steps
+        self.neighbours = [()] * (self.width * self.height)
+        walls = level.wall_grid
+        for y in range(self.height):
+            for x in range(self.width):
+                if walls[y * self.width + x]:
+                    continue
+                links = []
+                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)):
+                    nx, ny = x + dx, y + dy
+                    if not (0 <= nx < self.width and 0 <= ny < self.height) or walls[ny * self.width + nx]:
+                        continue
+                    if dx and dy:
+                        side_a, side_b = y * self.width + nx, ny * self.width + x
+                        if walls[side_a] or walls[side_b]:
+                            continue
+                        links.append((ny * self.width + nx, DIAGONAL_COST, side_a, side_b))
+                    else:
+                        links.append((ny * self.width + nx, STRAIGHT_COST, -1, -1))
+                self.neighbours[y * self.width + x] = tuple(links)
+
+    def get_tile(self, x, y):
+        tx, ty = int(x // TILE_SIZE), int(y // TILE_SIZE)
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return ty * self.width + tx
+        return None
+
+    def update(self, x, y):
+        """Rebuild the field if the player (at x, y) changed tiles or the doors changed, once per frame"""
+        source = self.get_tile(x, y)
+        if source == self.source and self.door_revision == self.level.door_revision:
+            return False
+        self.source = source
+        self.door_revision = self.level.door_revision
+        self.rebuild()
+        return True
+
+    def rebuild(self):
+        distance = self.distance
+        distance[:] = self.unreached
+        self.rebuilds += 1
+        if self.source is None or self.level.wall_grid[self.source]:
+            return
+
+        blocked = self.level.blocked_grid
+        door_ids = self.level.door_id_grid
+        neighbours = self.neighbours
+        door_cost = FLOW_FIELD_DOOR_COST * STRAIGHT_COST
+        max_cost = FLOW_FIELD_RANGE * STRAIGHT_COST
+
+        distance[self.source] = 0
+        queue = [(0, self.source)]
+        while queue:
+            cost, tile = heapq.heappop(queue)
+            if cost > distance[tile]:
+                continue
+            for other, step, side_a, side_b in neighbours[tile]:
+                if side_a >= 0 and (blocked[side_a] or blocked[side_b]):
+                    continue  # No cutting the corner of a closed door
+                new_cost = cost + step
+                if blocked[other] and door_ids[other] >= 0:
+                    new_cost += door_cost
+                if new_cost < distance[other] and new_cost <= max_cost:
+                    distance[other] = new_cost
+                    heapq.heappush(queue, (new_cost, other))
+
+    def get_direction(self, x, y):
+        """Unit vector from (x, y) to the centre of the neighbouring tile closest to the player
+
+        None in or next to the player's tile, or when the player is out of reach (use a straight line then).
+        """
+        tile = self.get_tile(x, y)
+        if tile is None:
+            return None
+        distance = self.distance
+        best, best_distance = tile, distance[tile]
+        if best_distance == 0 or best_distance == UNREACHED:
+            return None
+
+        blocked = self.level.blocked_grid
+        for other, _, side_a, side_b in self.neighbours[tile]:
+            if distance[other] < best_distance and (side_a < 0 or not (blocked[side_a] or blocked[side_b])):
+                best, best_distance = other, distance[other]
+        if best_distance == 0 or best == tile:
+            return None  # Next to the player's tile (or stuck): head straight for the player
+
+        dx = (best % self.width + 0.5) * TILE_SIZE - x
+        dy = (best // self.width + 0.5) * TILE_SIZE - y
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return None
+        return dx / length, dy / length
@@ -0,0 +1,131 @@
+import pygame as pg
+from data.config import TILE_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # The frame buffer backend needs NumPy, Raycaster falls back to surface blits
+    np = None
+
+
+class FrameBuffer:
+    """Whole-frame pixel buffer for the 3D view, pushed to the screen with one surfarray.blit_array
+
+    Pixels are stored already mapped to the format of the target surface (pixels[x, y]),
+    so textures and sprites are packed once and the frame is copied without conversion.
+    """
+
+    def __init__(self, surface):
+        self.width, self.height = surface.get_size()
+        self.shifts = surface.get_shifts()[:3]
+        self.pixels = np.zeros((self.width, self.height), dtype=np.uint32)
+        self.rows = np.arange(self.height)
+        self.background = np.zeros(self.height, dtype=np.uint32)
+        self._textures = None  # (source arrays, (ceiling, floor), packed texel columns)
+        self.pending = False  # Holds a frame that still has to be presented
+
+    def map_rgb(self, rgb):
+        """Pack an (..., 3) RGB array into mapped pixel values of the target surface"""
+        rgb = rgb.astype(np.uint32)
+        red, green, blue = self.shifts
+        return (rgb[..., 0] << red) | (rgb[..., 1] << green) | (rgb[..., 2] << blue)
+
+    def clear(self, floor_color, ceiling_color=(0, 0, 0)):
+        colors = self.map_rgb(np.array([ceiling_color, floor_color]))
+        self.background[:self.height // 2] = colors[0]
+        self.background[self.height // 2:] = colors[1]
+
+    def get_texel_columns(self, texture_cache):
+        """Packed texture columns framed by a ceiling texel and a floor texel: columns[slot, x, 1 + y]
+
+        Rows outside the wall and transparent texels then read the background straight from the table.
+        """
+        arrays = texture_cache.get_texture_arrays()
+        ceiling, floor = int(self.background[0]), int(self.background[-1])
+        if self._textures is None or self._textures[0] is not arrays or self._textures[1] != (ceiling, floor):
+            pixels, opaque, _ = arrays
+            slots = len(pixels)
+            columns = np.empty((slots, TILE_SIZE, TILE_SIZE + 2), dtype=np.uint32)
+            columns[:, :, 0] = ceiling
+            columns[:, :, -1] = floor
+            # Transparent texels show what is behind the wall: ceiling above the horizon, floor below
+            background = np.where(np.arange(TILE_SIZE) < TILE_SIZE // 2, ceiling, floor).astype(np.uint32)
+            columns[:, :, 1:-1] = np.where(opaque, self.map_rgb(pixels), background)
+            # Slot 0 (GIDs without image) draws nothing
+            columns[0, :, 1:-1] = background
+            self._textures = (arrays, (ceiling, floor), columns.reshape(-1))
+        return self._textures[2]
+
+    def draw_walls(self, columns, texture_cache, ray_width, projection, first_ray=0, mip_distances=()):
+        """Draw (depth, gid, tex_x, render_width) ray columns, starting at the screen column of first_ray
+
+        Only touches the screen columns of these rays, so bands of rays can be drawn at the same time.
+        Rays deeper than mip_distances[L - 1] sample mip level L. Returns the depth of every screen column drawn.
+        """
+        columns = np.asarray(columns, dtype=float).reshape(-1, 4)
+        num_rays = len(columns)
+        depth = columns[:, 0]
+        gid = columns[:, 1].astype(int)
+        tex_x = np.clip(columns[:, 2].astype(int), 0, TILE_SIZE - 1)
+        render_width = columns[:, 3].astype(int)
+
+        texels = self.get_texel_columns(texture_cache)
+        texture_pixels, _, slot_by_gid = texture_cache.get_texture_arrays()
+        slot = np.where(gid < len(slot_by_gid), slot_by_gid[np.clip(gid, 0, len(slot_by_gid) - 1)], 0)
+        if len(mip_distances):
+            slots_per_level = len(texture_pixels) // texture_cache.mip_levels
+            slot += np.searchsorted(mip_distances, depth, side="right") * slots_per_level
+
+        # Index map: texel of every pixel of every ray column, -1 and TILE_SIZE fall on ceiling and floor
+        wall_height = projection / (depth + 0.0001)
+        safe_height = np.clip(wall_height.astype(int), 1, self.height * 2)
+        column_y = (self.height - safe_height) // 2
+        step = TILE_SIZE / safe_height
+        tex_y = np.floor((self.rows[None, :] - column_y[:, None]) * step[:, None]).astype(np.int32)
+        np.clip(tex_y, -1, TILE_SIZE, out=tex_y)
+        tex_y += ((slot * TILE_SIZE + tex_x) * (TILE_SIZE + 2) + 1).astype(np.int32)[:, None]
+        ray_pixels = np.take(texels, tex_y)
+
+        # Spread the ray columns over the screen columns they cover
+        pixels = self.pixels[first_ray * ray_width:]
+        screen_width = min(num_rays * ray_width, len(pixels))
+        full_rays = screen_width // ray_width
+        target = pixels[:full_rays * ray_width].reshape(full_rays, ray_width, self.height)
+        target[:] = ray_pixels[:full_rays, None, :]
+        if full_rays < num_rays and screen_width > full_rays * ray_width:
+            pixels[full_rays * ray_width:screen_width] = ray_pixels[full_rays]
+
+        # Doors are drawn thinner than a ray
+        for ray in np.nonzero(render_width[:full_rays] < ray_width)[0]:
+            pixels[ray * ray_width + render_width[ray]:(ray + 1) * ray_width] = self.background
+
+        return np.repeat(depth, ray_width)[:screen_width]
+
+    def fill_background(self, first_column):
+        """Background for the screen columns no ray covers"""
+        self.pixels[first_column:] = self.background
+
+    def blit_sprite(self, sprite, x, y, depth, z_buffer):
+        """Composite a scaled sprite, keeping only the columns nearer than the z-buffer"""
+        width, height = sprite.get_size()
+        x, y = int(x), int(y)
+        left, right = max(0, x), min(self.width, x + width)
+        top, bottom = max(0, y), min(self.height, y + height)
+        if left >= right or top >= bottom:
+            return
+
+        visible = depth < z_buffer[left:right]
+        if not visible.any():
+            return
+
+        area = (slice(left - x, right - x), slice(top - y, bottom - y))
+        if sprite.get_flags() & pg.SRCALPHA:
+            opaque = pg.surfarray.pixels_alpha(sprite)[area] > 127
+        else:
+            opaque = pg.surfarray.array_colorkey(sprite)[area] > 0
+        mask = opaque & visible[:, None]
+
+        target = self.pixels[left:right, top:bottom]
+        target[mask] = self.map_rgb(pg.surfarray.pixels3d(sprite)[area][mask])
+
+    def present(self, surface):
+        pg.surfarray.blit_array(surface, self.pixels)
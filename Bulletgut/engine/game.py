@@ -1,10 +1,12 @@
-import math
 import random
 import pygame as pg
 from data.config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TILE_SIZE, HUD_HEIGHT
 from engine.raycaster import Raycaster
+from engine.sprite_cache import sprite_cache
+from engine.dynamic_resolution import DynamicResolution
 from entities.pickups.key_pickup import KeyPickup
 from entities.pickups.weapon_pickup import WeaponPickup
+from entities.pickups.pickup import PICKUP_RADIUS
 from entities.player import Player
 from engine.level import Level
 from ui.hud import HUD
@@ -49,6 +51,7 @@ class Game:
         self.level = None
         self.level_name = ""
         self.raycaster = None
+        self.dynamic_resolution = None
         self.enemies = []
         self.projectiles = []
         self.effects = []
@@ -148,10 +151,12 @@ class Game:
         self.hud.render(self.player, self)
         self.restart_anim_surface = self.screen.copy()
 
-        # 2. Recharger le niveau IMMÉDIATEMENT (en arrière-plan)
+        # 2. Remettre le niveau dans son état initial IMMÉDIATEMENT (en arrière-plan) : pas de rechargement,
+        #    le niveau restaure l'instantané pris à son chargement
         self.reset_player_state()
         self.stop_all_sounds()
-        self.load_level(self.level_manager.get_current())
+        self.level.restore_snapshot()
+        self.load_level(self.level_manager.get_current(), self.level)
         self.update_statistics()
 
         # 3. Configurer l'animation de transition
@@ -164,12 +169,13 @@ class Game:
 
         print("[DEBUG] Level reloaded behind transition")
 
-    def load_level(self, path):
+    def load_level(self, path, level=None):
         # Sauvegarder l'état du joueur avant de charger le nouveau niveau (sauf si c'est le premier niveau)
         if not self.is_first_level and self.player and self.player.alive:
             self.save_player_state()
 
-        self.level = Level(path)
+        # Le niveau suivant est préparé en arrière-plan : il ne reste que la conversion des surfaces et les entités
+        self.level = level or Level(path, self.level_manager.take_preloaded(path))
         self.level_name = self.level.get_map_name_from_tmx(path)
         self.level.game = self
         spawn_x, spawn_y = self.level.spawn_point
@@ -184,11 +190,20 @@ class Game:
 
         self.level_manager.load_level_music(self.level)
 
+        if self.raycaster is not None:
+            self.raycaster.close()
         self.raycaster = Raycaster(self.level, self.player)
+        if self.dynamic_resolution is None:
+            self.dynamic_resolution = DynamicResolution(self.raycaster)
+        else:
+            self.dynamic_resolution.attach(self.raycaster)
         self.enemies = self.level.enemies
         self.projectiles = []
         self.effects = []
 
+        # Le niveau suivant se prépare pendant qu'on joue celui-ci (et pendant l'intermission)
+        self.level_manager.preload_next()
+
     def save_player_state(self):
         """Sauvegarde l'état du joueur (armes, munitions, armure)"""
         if self.player:
@@ -364,6 +379,19 @@ class Game:
             elif event.key == pg.K_RETURN:
                 if self.show_intermission and self.intermission_screen.can_accept_input():
                     self.start_level_transition()
+            elif event.key == pg.K_F3:
+                kernel = self.raycaster.cycle_wall_kernel()
+                self.hud.messages.add(f"WALL KERNEL: {kernel.upper()}")
+            elif event.key == pg.K_F4:
+                backend = self.raycaster.cycle_render_backend()
+                self.hud.messages.add(f"RENDER BACKEND: {backend.upper()}")
+            elif event.key == pg.K_F5:
+                preset = self.raycaster.cycle_resolution_preset()
+                self.dynamic_resolution.reset()
+                self.hud.messages.add(f"RESOLUTION: {preset.upper()} ({self.raycaster.num_rays} RAYS)")
+            elif event.key == pg.K_F6:
+                enabled = self.dynamic_resolution.set_enabled(not self.dynamic_resolution.enabled)
+                self.hud.messages.add(f"DYNAMIC RESOLUTION: {'ON' if enabled else 'OFF'}")
 
     def handle_events(self):
         """Méthode originale pour gérer tous les événements (mode standalone)"""
@@ -424,6 +452,9 @@ class Game:
         if self.game_paused:
             return
 
+        if not self.level_complete:
+            self.dynamic_resolution.update(dt)
+
         # Pendant la transition de redémarrage
         if self.restart_anim_in_progress:
             self.update_restart_transition()
@@ -476,11 +507,12 @@ class Game:
         if self.player.damage_flash_timer > 0:
             self.player.damage_flash_timer = max(0.0, self.player.damage_flash_timer - dt)
 
-        # Mettre à jour les pickups
-        for pickup in self.level.pickups:
+        # Mettre à jour les pickups (seulement ceux assez proches du joueur pour être ramassés)
+        for pickup in self.level.pickup_hash.query_radius(self.player.x, self.player.y, PICKUP_RADIUS):
             was_picked_up = pickup.picked_up
             pickup.update(self.player, self)
             if not was_picked_up and pickup.picked_up:
+                self.level.pickup_hash.remove(pickup)
                 if getattr(pickup, 'dropped_by_enemy', False):
                     continue
                 if hasattr(pickup, 'pickup_type'):
@@ -494,9 +526,14 @@ class Game:
         for door in self.level.doors:
             door.update(dt)
 
-        # Mettre à jour les ennemis
-        for enemy in self.level.enemies:
-            enemy.update(self.player, dt)
+        # Un seul champ de distances pour tous les ennemis, recalculé quand le joueur change de case
+        self.level.flow_field.update(self.player.x, self.player.y)
+
+        # Perception de tous les ennemis en un seul passage, lue ensuite par leurs update
+        self.level.perception.update(self.player)
+
+        # Mettre à jour les ennemis dont c'est le tour (le planificateur gère les paliers et le budget)
+        for enemy in self.level.ai_scheduler.update(self.player, dt):
             if hasattr(enemy, 'just_died') and enemy.just_died:
                 self.enemies_killed += 1
                 enemy.just_died = False
@@ -537,19 +574,14 @@ class Game:
     def render_game_without_intermission(self):
         self.screen.fill((0, 0, 0))
         self.raycaster.cast_rays(self.render_surface, self.player, self.level.floor_color)
-        self.raycaster.render_pickups(self.render_surface, self.player, self.level.pickups)
-        self.raycaster.render_enemies(self.render_surface, self.player, self.level.enemies)
+        self.raycaster.render_billboards(self.render_surface, self.player, self.get_billboard_objects())
+        self.raycaster.present(self.render_surface)
 
         if self.player.weapon:
             self.player.weapon.render(self.render_surface)
             if hasattr(self.player.weapon, 'render_detection_line'):
                 self.player.weapon.render_detection_line(self.render_surface)
 
-        self._render_projectiles()
-
-        for effect in self.effects:
-            effect.render(self.render_surface, self.raycaster, self.player)
-
         if self.crosshair_enabled:
             center_x = SCREEN_WIDTH // 2 - self.crosshair_image.get_width() // 2
             center_y = (SCREEN_HEIGHT - HUD_HEIGHT) // 2 - self.crosshair_image.get_height() // 2
@@ -569,16 +601,17 @@ class Game:
             self.handle_events()
             self.update()
             self.render()
+        self.close()
 
-    def _render_projectiles(self):
-        for projectile in self.projectiles:
-            dx = projectile.x - self.player.x
-            dy = projectile.y - self.player.y
-            rel_angle = math.atan2(dy, dx) - self.player.angle
-            rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
-            if abs(rel_angle) > self.raycaster.fov / 2:
-                continue
-            projectile.render(self.render_surface, self.raycaster)
+    def close(self):
+        """Arrête les threads du jeu avant de l'abandonner (retour au menu ou fermeture)"""
+        if self.raycaster is not None:
+            self.raycaster.close()
+        self.level_manager.shutdown()
+
+    def get_billboard_objects(self):
+        """Every sprite of the 3D view, drawn together in depth order by the raycaster"""
+        return self.level.pickups + self.level.enemies + self.projectiles + self.effects
 
     def draw_restart_transition(self):
         """Dessine la transition de redémarrage PAR-DESSUS le nouveau jeu"""
@@ -615,6 +648,9 @@ class Game:
 
             print(
                 f"[LEVEL] Level completed! Stats - Enemies: {self.enemies_killed}/{self.initial_enemy_count}, Items: {self.items_collected}/{self.initial_item_count}")
+            self.level.texture_cache.report()
+            sprite_cache.report()
+            self.raycaster.wall_cache.report()
 
     # def reload_level(self):
     #     self.reset_player_state()  # Remise à zéro pour éviter de restaurer un ancien état
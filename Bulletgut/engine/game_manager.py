@@ -66,6 +66,7 @@ class GameManager:
 
         # Nettoyer le jeu si nécessaire
         if self.game:
+            self.game.close()
             self.game = None
 
         # ⭐ NOUVEAU : Reset du flag game_ready et de la surface
@@ -232,5 +233,7 @@ class GameManager:
             self.update()
             self.render()
 
+        if self.game:
+            self.game.close()
         print("[GAME_MANAGER] Game manager stopped")
         pg.quit()
\ No newline at end of file
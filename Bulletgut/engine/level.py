@@ -1,5 +1,6 @@
+import copy
 import pygame as pg
-from pytmx.util_pygame import load_pygame
+from array import array
 from data.config import TILE_SIZE
 from entities.door import Door
 from entities.gunner import Gunner
@@ -11,16 +12,51 @@ from entities.pickups.ammo_pickup import AmmoPickup
 from entities.pickups.item_pickup import ItemPickup
 from entities.pickups.weapon_pickup import WeaponPickup
 from entities.level_exit import LevelExit
+from engine.texture_cache import TextureCache
+from engine.pvs import PotentiallyVisibleSet
+from engine.level_cache import load_compiled_level
+from engine.flow_field import FlowField
+from engine.line_of_sight import LineOfSight
+from engine.spatial_hash import SpatialHash
+from engine.ai_scheduler import AIScheduler
+from engine.perception import Perception
+from utils.assets import get_mip_memory
+
+try:
+    import numpy as np
+except ImportError:  # The flat grids work without NumPy, only grid_view() needs it
+    np = None
+
+# Entity attributes copied into (and out of) a snapshot, everything else (Surfaces, sounds...) stays shared
+SNAPSHOT_COPIED_TYPES = (list, dict, set, pg.Rect, pg.math.Vector2)
+
+
+def copy_entity_state(state):
+    return {name: copy.copy(value) if isinstance(value, SNAPSHOT_COPIED_TYPES) else value
+            for name, value in state.items()}
+
+
+def prepare_level(filename):
+    """The part of a level load that needs no display: compiled map, wall grid, PVS table, decoded tilesets
+
+    Runs on LevelManager's preload thread; Level(filename, prepared) then only does the
+    Surface conversions and entity setup on the main thread.
+    """
+    compiled = load_compiled_level(filename)
+    compiled.decode_tilesets()
+    wall_grid = bytearray(1 if gid else 0 for gid in compiled.wall_gids)
+    # Tile to tile visibility (doors open), shipped as a .pvs file next to the map
+    pvs = PotentiallyVisibleSet.for_level(filename, wall_grid, compiled.width, compiled.height)
+    return compiled, wall_grid, pvs
+
 
 class Level:
-    def __init__(self, filename):
+    def __init__(self, filename, prepared=None):
         self.game=None
-        self.tmx_data = load_pygame(filename)
+        # Compiled map (grids, objects, properties, tileset references), from the .lvc cache when it matches
+        self.tmx_data, self.wall_grid, self.pvs = prepared or prepare_level(filename)
         self.map_width = self.tmx_data.width
         self.map_height = self.tmx_data.height
-        self.walls_layer = self.tmx_data.get_layer_by_name("Walls")
-        self.floor_layer = self.tmx_data.get_layer_by_name("Floor")
-        self.doors_layer = self.tmx_data.get_layer_by_name("Doors")
 
         if "floor_color" in self.tmx_data.properties:
             hex_color = self.tmx_data.properties["floor_color"].lstrip("#")
@@ -32,92 +68,155 @@ class Level:
             self.floor_color = (30, 30, 30)
 
         self.enemies = self.load_enemies()
-        self.collision_map = self.build_collision_map()
+        # Flat row-major tile grids (index y * map_width + x): wall solidity and layer GIDs
+        self.wall_gids = self.tmx_data.wall_gids
+        self.door_gids = self.tmx_data.door_gids
         self.spawn_point = self.get_player_spawn()
         self.doors = self.load_doors()
+
+        # Door grids: door index per tile (-1 none), tiles blocked by a wall or a blocking door,
+        # and the GID the raycaster draws in each tile (door GID while its door blocks)
+        self.door_revision = 0  # Bumped every time a door starts or stops blocking
+        self.door_id_grid = self.build_door_id_grid()
+        self.blocked_grid = bytearray(self.wall_grid)
+        self.gid_grid = array("H", self.wall_gids)
+        for door in self.doors:
+            self.update_door_tile(door)
+        # Path distance to the player's tile, updated once per frame and read by every chasing enemy
+        self.flow_field = FlowField(self)
+        # Tile to tile sight lines, cached until a door they cross changes
+        self.line_of_sight = LineOfSight(self)
         self.pickups = self.load_pickups()
 
         self.level_exits = self.load_level_exits()
+        # Tile buckets of the enemies and pickups, for hit tests against the nearby ones only
+        self.enemy_hash = SpatialHash()
+        self.pickup_hash = SpatialHash()
+        self.build_spatial_hashes()
+        # Distances, directions and flags of every enemy towards the player, computed once per frame
+        self.perception = Perception(self.enemies)
+        # Which enemies think each frame (distance and visibility tiers, per-frame time budget)
+        self.ai_scheduler = AIScheduler(self)
         self.music_file = self.load_level_music()
 
         # Store closed door GIDs for rendering
         self.closed_door_gids = self.find_closed_door_gids()
+
+        # Wall and door textures, pre-sliced into columns for the raycaster
+        self.texture_cache = TextureCache(self.tmx_data, self.get_texture_gids())
+        self.texture_cache.report()
+        self.report_memory()
+
+        # Pristine state of the entities, a restart restores it instead of loading the level again
+        self.snapshot = self.take_snapshot()
         print(f"[DEBUG] Ennemis visibles : {[enemy for enemy in self.enemies if enemy.alive]}")
 
-    def build_collision_map(self):
-        grid = []
-        for y in range(self.map_height):
-            row = []
-            for x in range(self.map_width):
-                tile = self.walls_layer.data[y][x]
-                gid = tile.gid if hasattr(tile, 'gid') else tile
-                row.append(1 if gid != 0 else 0)  # 1 walls, #0 empty
-            grid.append(row)
+    def take_snapshot(self):
+        """Attributes of every enemy, pickup, door and level exit, and the membership of their lists"""
+        lists = (self.enemies, self.pickups, self.doors, self.level_exits)
+        return ([list(entities) for entities in lists],
+                [(entity, copy_entity_state(vars(entity))) for entities in lists for entity in entities])
+
+    def restore_snapshot(self):
+        """Put the level back in its just-loaded state (the lists are refilled in place)"""
+        memberships, states = self.snapshot
+        for entities, members in zip((self.enemies, self.pickups, self.doors, self.level_exits), memberships):
+            entities[:] = members
+        for entity, state in states:
+            vars(entity).clear()
+            vars(entity).update(copy_entity_state(state))
+
+        for door in self.doors:
+            self.update_door_tile(door)
+        self.door_revision += 1
+        self.line_of_sight.clear()
+        self.build_spatial_hashes()
+        self.perception.reset()
+        self.ai_scheduler.reset()
+
+    def build_spatial_hashes(self):
+        """Register every enemy and every pickup not picked up yet"""
+        self.enemy_hash.clear()
+        self.pickup_hash.clear()
+        for enemy in self.enemies:
+            self.enemy_hash.insert(enemy, enemy.size)
+        for pickup in self.pickups:
+            if not pickup.picked_up:
+                self.pickup_hash.insert(pickup)
+
+    def report_memory(self):
+        """Pixel memory of the wall textures and enemy frames, without and with their mip chains"""
+        texture_bytes = self.texture_cache.get_memory_usage()
+        sprite_bytes, sprite_mip_bytes = get_mip_memory()
+        total = texture_bytes + sprite_bytes
+        with_mips = total + self.texture_cache.get_mip_memory_usage() + sprite_mip_bytes
+        print(f"[MEMORY] Walls {texture_bytes / 1024:.1f} KB + enemy frames {sprite_bytes / 1024:.1f} KB: "
+              f"{total / 1024:.1f} KB without mip chains, {with_mips / 1024:.1f} KB with")
+
+    def build_door_id_grid(self):
+        grid = array("h", [-1]) * (self.map_width * self.map_height)
+        for index, door in enumerate(self.doors):
+            if 0 <= door.grid_x < self.map_width and 0 <= door.grid_y < self.map_height:
+                grid[door.grid_y * self.map_width + door.grid_x] = index
         return grid
 
+    def grid_view(self, grid):
+        """(map_height, map_width) NumPy view of one of the flat grids, shares its memory (no copy)"""
+        return np.asarray(memoryview(grid)).reshape(self.map_height, self.map_width)
+
+    def update_door_tile(self, door):
+        """Write the blocking state and drawn GID of a door's tile into the grids"""
+        if 0 <= door.grid_x < self.map_width and 0 <= door.grid_y < self.map_height:
+            index = door.grid_y * self.map_width + door.grid_x
+            blocking = door.is_blocking()
+            self.blocked_grid[index] = 1 if blocking or self.wall_grid[index] else 0
+            self.gid_grid[index] = self.door_gids[index] if blocking else self.wall_gids[index]
+
+    def on_door_state_changed(self, door):
+        """Called by a Door when it starts or stops blocking"""
+        self.update_door_tile(door)
+        self.door_revision += 1
+        if 0 <= door.grid_x < self.map_width and 0 <= door.grid_y < self.map_height:
+            self.line_of_sight.on_door_changed(self.door_id_grid[door.grid_y * self.map_width + door.grid_x])
+
+    def get_door_at_tile(self, tx, ty):
+        if 0 <= tx < self.map_width and 0 <= ty < self.map_height:
+            index = self.door_id_grid[ty * self.map_width + tx]
+            if index >= 0:
+                return self.doors[index]
+        return None
+
     def is_blocked(self, x, y):
-        """Version corrigée de is_blocked avec gestion robuste des collisions"""
-        # Conversion en coordonnées de grille avec gestion des cas limites
+        """Wall or blocking door at a world position, everything outside the map is blocked"""
         tx = int(x // TILE_SIZE)
         ty = int(y // TILE_SIZE)
+        if 0 <= tx < self.map_width and 0 <= ty < self.map_height:
+            return self.blocked_grid[ty * self.map_width + tx] == 1
+        return True
 
-        # Vérifier les limites de la carte
-        if not (0 <= tx < self.map_width and 0 <= ty < self.map_height):
-            return True
-
-        # Vérifier collision avec les murs
-        if self.collision_map[ty][tx] == 1:
+    def is_rect_blocked(self, rect):
+        """Exact rectangle against grid test over the tiles the rectangle covers
+
+        A covered wall tile blocks; a covered blocking door only blocks where the rectangle
+        overlaps its current (partly open) bounds. Anything reaching outside the map is blocked.
+        """
+        left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+        min_tx, max_tx = left // TILE_SIZE, (right - 1) // TILE_SIZE
+        min_ty, max_ty = top // TILE_SIZE, (bottom - 1) // TILE_SIZE
+        if min_tx < 0 or min_ty < 0 or max_tx >= self.map_width or max_ty >= self.map_height:
             return True
 
-        # Vérifier collision avec les portes
-        for door in self.doors:
-            if door.grid_x == tx and door.grid_y == ty and door.is_blocking():
-                return True
-
-        return False
-
-    def is_rect_blocked(self, rect):
-        """Version améliorée de is_rect_blocked avec plus de points de test"""
-        # Points de test plus nombreux pour une détection précise
-        test_points = []
-
-        # Points aux coins
-        test_points.extend([
-            (rect.left, rect.top),
-            (rect.right - 1, rect.top),
-            (rect.left, rect.bottom - 1),
-            (rect.right - 1, rect.bottom - 1)
-        ])
-
-        # Points au centre des bords
-        test_points.extend([
-            (rect.centerx, rect.top),
-            (rect.centerx, rect.bottom - 1),
-            (rect.left, rect.centery),
-            (rect.right - 1, rect.centery)
-        ])
-
-        # Points supplémentaires pour les grandes entités
-        step_size = min(TILE_SIZE // 4, 8)  # Pas plus petit mais suffisant
-
-        # Échantillonnage horizontal
-        for x in range(rect.left + step_size, rect.right, step_size):
-            test_points.extend([
-                (x, rect.top),
-                (x, rect.bottom - 1)
-            ])
-
-        # Échantillonnage vertical
-        for y in range(rect.top + step_size, rect.bottom, step_size):
-            test_points.extend([
-                (rect.left, y),
-                (rect.right - 1, y)
-            ])
-
-        # Tester tous les points
-        for point_x, point_y in test_points:
-            if self.is_blocked(point_x, point_y):
-                return True
+        blocked = self.blocked_grid
+        for ty in range(min_ty, max_ty + 1):
+            row_end = ty * self.map_width + max_tx + 1
+            index = blocked.find(1, ty * self.map_width + min_tx, row_end)
+            while index != -1:
+                if self.wall_grid[index]:
+                    return True
+                bounds = self.doors[self.door_id_grid[index]].collision_bounds
+                if left < bounds["max_x"] and right > bounds["min_x"] and top < bounds["max_y"] and bottom > bounds["min_y"]:
+                    return True
+                index = blocked.find(1, index + 1, row_end)
 
         return False
 
@@ -128,24 +227,22 @@ class Level:
         return TILE_SIZE * 2, TILE_SIZE * 2
 
     def get_gid(self, wx, wy):
+        """GID drawn at a world position: the door tile while its door blocks, else the wall tile"""
         grid_x = int(wx // TILE_SIZE)
         grid_y = int(wy // TILE_SIZE)
-
         if 0 <= grid_x < self.map_width and 0 <= grid_y < self.map_height:
-            # Check for door first
-            for door in self.doors:
-                if door.grid_x == grid_x and door.grid_y == grid_y and door.is_blocking():
-                    # Get the door tile GID from the doors layer
-                    door_tile = self.doors_layer.data[grid_y][grid_x]
-                    door_gid = door_tile.gid if hasattr(door_tile, 'gid') else door_tile
-                    return door_gid
-
-            # If no blocking door, check walls
-            tile = self.walls_layer.data[grid_y][grid_x]
-            return tile.gid if hasattr(tile, 'gid') else tile
+            return self.gid_grid[grid_y * self.map_width + grid_x]
+        return 0
 
+    def get_wall_gid_at_tile(self, tx, ty):
+        if 0 <= tx < self.map_width and 0 <= ty < self.map_height:
+            return self.wall_gids[ty * self.map_width + tx]
         return 0
 
+    def get_texture_gids(self):
+        """Every GID the raycaster can draw: walls and doors layers"""
+        return sorted((set(self.wall_gids) | set(self.door_gids)) - {0})
+
     def find_closed_door_gids(self):
         door_gids = {}
 
@@ -156,30 +253,15 @@ class Level:
             # Find adjacent wall tiles based on door axis
             if door.axis == "x":  # Horizontal sliding door
                 # Look for wall tiles to the left and right
-                if 0 <= grid_x - 1 < self.map_width:
-                    left_tile = self.walls_layer.data[grid_y][grid_x - 1]
-                    left_gid = left_tile.gid if hasattr(left_tile, 'gid') else left_tile
-                    if left_gid != 0:
-                        door_gids[(grid_x, grid_y, "left")] = left_gid
-
-                if 0 <= grid_x + 1 < self.map_width:
-                    right_tile = self.walls_layer.data[grid_y][grid_x + 1]
-                    right_gid = right_tile.gid if hasattr(right_tile, 'gid') else right_tile
-                    if right_gid != 0:
-                        door_gids[(grid_x, grid_y, "right")] = right_gid
+                neighbours = ((grid_x - 1, grid_y, "left"), (grid_x + 1, grid_y, "right"))
             else:  # Vertical sliding door
                 # Look for wall tiles above and below
-                if 0 <= grid_y - 1 < self.map_height:
-                    top_tile = self.walls_layer.data[grid_y - 1][grid_x]
-                    top_gid = top_tile.gid if hasattr(top_tile, 'gid') else top_tile
-                    if top_gid != 0:
-                        door_gids[(grid_x, grid_y, "top")] = top_gid
-
-                if 0 <= grid_y + 1 < self.map_height:
-                    bottom_tile = self.walls_layer.data[grid_y + 1][grid_x]
-                    bottom_gid = bottom_tile.gid if hasattr(bottom_tile, 'gid') else bottom_tile
-                    if bottom_gid != 0:
-                        door_gids[(grid_x, grid_y, "bottom")] = bottom_gid
+                neighbours = ((grid_x, grid_y - 1, "top"), (grid_x, grid_y + 1, "bottom"))
+
+            for check_x, check_y, side in neighbours:
+                gid = self.get_wall_gid_at_tile(check_x, check_y)
+                if gid != 0:
+                    door_gids[(grid_x, grid_y, side)] = gid
 
         return door_gids
 
@@ -192,8 +274,7 @@ class Level:
             return self._get_wall_texture_for_door(door)
 
         # Si la porte est en mouvement ou ouverte, utiliser la texture de porte
-        tile = self.doors_layer.data[grid_y][grid_x]
-        door_gid = tile.gid if hasattr(tile, 'gid') else tile
+        door_gid = self.door_gids[grid_y * self.map_width + grid_x]
 
         # Fallback si pas de texture de porte
         if door_gid == 0:
@@ -209,22 +290,14 @@ class Level:
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
 
         for dx, dy in directions:
-            check_x, check_y = grid_x + dx, grid_y + dy
-
-            if 0 <= check_x < self.map_width and 0 <= check_y < self.map_height:
-                tile = self.walls_layer.data[check_y][check_x]
-                gid = tile.gid if hasattr(tile, 'gid') else tile
-
-                if gid != 0:
-                    return gid
+            gid = self.get_wall_gid_at_tile(grid_x + dx, grid_y + dy)
+            if gid != 0:
+                return gid
 
         # Fallback: première texture de mur trouvée
-        for y in range(self.map_height):
-            for x in range(self.map_width):
-                tile = self.walls_layer.data[y][x]
-                gid = tile.gid if hasattr(tile, 'gid') else tile
-                if gid != 0:
-                    return gid
+        for gid in self.wall_gids:
+            if gid != 0:
+                return gid
 
         return 1  # Ultimate fallback
 
@@ -241,6 +314,7 @@ class Level:
 
             door = Door(grid_x, grid_y, auto_close_time, thickness)
             door.axis = axis
+            door.level = self
 
             if "required_key" in obj.properties:
                 value = obj.properties["required_key"].strip().lower()
@@ -379,8 +453,7 @@ class Level:
 
     @staticmethod
     def get_map_name_from_tmx(path):
-        tmx_data = load_pygame(path)
-        return tmx_data.properties.get("map_name", "UNKNOWN MAP")
+        return load_compiled_level(path).properties.get("map_name", "UNKNOWN MAP")
 
     def load_level_music(self):
         """Charge la musique du niveau depuis les propriétés Tiled"""
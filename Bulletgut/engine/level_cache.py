@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import struct
+import zlib
+from array import array
+import pytmx
+from pytmx.util_pygame import pygame_image_loader
+from data.config import LEVEL_CACHE
+
+LEVEL_CACHE_MAGIC = b"BGLVL1"
+LEVEL_CACHE_VERSION = 1  # Bump when the payload layout changes, every cache is then rebuilt
+
+_compiled_levels = {}  # .tmx path -> CompiledLevel, reused while the source hash matches
+_tileset_loaders = {}  # (image path, colorkey) -> pytmx pygame tile loader
+
+
+class LevelObject:
+    """One Tiled object, with the fields Level reads from pytmx objects"""
+
+    def __init__(self, name, type, x, y, properties):
+        self.name = name
+        self.type = type
+        self.x = x
+        self.y = y
+        self.properties = properties
+
+
+class CompiledLevel:
+    """Everything Level needs from a .tmx, without pytmx parsing
+
+    Stands in for the pytmx TiledMap: width, height, properties, objects and
+    get_tile_image_by_gid(). wall_gids and door_gids are the Walls and Doors layers
+    as flat row-major uint16 arrays. tiles maps a GID to the tileset image, colorkey,
+    rect and flip flags it is cut from; tile images are only loaded when asked for.
+    """
+
+    def __init__(self, width, height, properties, wall_gids, door_gids, objects, tiles, key=b""):
+        self.width = width
+        self.height = height
+        self.properties = properties
+        self.wall_gids = wall_gids
+        self.door_gids = door_gids
+        self.objects = objects
+        self.tiles = tiles
+        self.key = key
+        self._images = {}
+
+    @classmethod
+    def compile(cls, tmx_path, key=b""):
+        """Parse the .tmx with pytmx, recording where each tile image comes from instead of loading it"""
+        def record_loader(path, colorkey, **kwargs):
+            return lambda rect=None, flags=None: (path, colorkey, rect, tuple(flags) if flags else None)
+
+        tmx_data = pytmx.TiledMap(tmx_path, image_loader=record_loader)
+        grids = []
+        for name in ("Walls", "Doors"):
+            grid = array("H")
+            for row in tmx_data.get_layer_by_name(name).data:
+                grid.extend(tile.gid if hasattr(tile, 'gid') else tile for tile in row)
+            grids.append(grid)
+
+        objects = [LevelObject(obj.name, obj.type, obj.x, obj.y, dict(obj.properties)) for obj in tmx_data.objects]
+        tiles = {gid: image for gid, image in enumerate(tmx_data.images) if image}
+        return cls(tmx_data.width, tmx_data.height, dict(tmx_data.properties), grids[0], grids[1], objects, tiles, key)
+
+    @staticmethod
+    def get_key(tmx_path):
+        """Hash of the .tmx source and cache version, a cache is only reused for the same file"""
+        with open(tmx_path, "rb") as f:
+            source = f.read()
+        return hashlib.sha1(source + struct.pack("<i", LEVEL_CACHE_VERSION)).digest()
+
+    @classmethod
+    def load(cls, path, key):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        header = len(LEVEL_CACHE_MAGIC) + 20
+        if data[:len(LEVEL_CACHE_MAGIC)] != LEVEL_CACHE_MAGIC or data[len(LEVEL_CACHE_MAGIC):header] != key:
+            print(f"[LEVEL CACHE] {os.path.basename(path)} is out of date, recompiling")
+            return None
+
+        try:
+            payload = zlib.decompress(data[header:])
+            width, height = struct.unpack_from("<HH", payload)
+            count = width * height
+            grids = []
+            for offset in (4, 4 + count * 2):
+                grid = array("H")
+                grid.frombytes(payload[offset:offset + count * 2])
+                grids.append(grid)
+            meta = json.loads(payload[4 + count * 4:].decode("utf-8"))
+        except (zlib.error, struct.error, ValueError) as e:
+            print(f"[LEVEL CACHE] {os.path.basename(path)} is unreadable ({e}), recompiling")
+            return None
+
+        objects = [LevelObject(*obj) for obj in meta["objects"]]
+        tiles = {int(gid): (path_, colorkey, tuple(rect) if rect else None, tuple(flags) if flags else None)
+                 for gid, (path_, colorkey, rect, flags) in meta["tiles"].items()}
+        return cls(width, height, meta["properties"], grids[0], grids[1], objects, tiles, key)
+
+    def save(self, path):
+        """Write the .lvc, the payload is serialized first and the file only replaced once fully written"""
+        meta = {"properties": self.properties,
+                "objects": [[obj.name, obj.type, obj.x, obj.y, obj.properties] for obj in self.objects],
+                "tiles": self.tiles}
+        payload = (struct.pack("<HH", self.width, self.height) + self.wall_gids.tobytes() + self.door_gids.tobytes()
+                   + json.dumps(meta).encode("utf-8"))
+        data = LEVEL_CACHE_MAGIC + self.key + zlib.compress(payload, 9)
+        temp_path = path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def decode_tilesets(self):
+        """Decode every tileset image of the map, without any Surface conversion (safe off the main thread)"""
+        for image_path, colorkey, _, _ in self.tiles.values():
+            get_tileset_loader(image_path, colorkey)
+
+    def get_tile_image_by_gid(self, gid):
+        """Tile Surface of a GID, cut from its tileset image the same way pytmx.load_pygame does"""
+        if gid not in self._images:
+            tile = self.tiles.get(gid)
+            if tile is None:
+                self._images[gid] = None
+            else:
+                image_path, colorkey, rect, flags = tile
+                loader = get_tileset_loader(image_path, colorkey)
+                self._images[gid] = loader(rect, pytmx.TileFlags(*flags) if flags else None)
+        return self._images[gid]
+
+
+def get_tileset_loader(image_path, colorkey):
+    """pytmx tile loader of a tileset image: the image is decoded once, tiles are cut and converted on call"""
+    loader = _tileset_loaders.get((image_path, colorkey))
+    if loader is None:
+        loader = _tileset_loaders[(image_path, colorkey)] = pygame_image_loader(image_path, colorkey)
+    return loader
+
+
+def get_cache_path(tmx_path):
+    return os.path.splitext(tmx_path)[0] + ".lvc"
+
+
+def load_compiled_level(tmx_path):
+    """Compiled level of a .tmx: in memory, else from the .lvc next to it, else compiled from the .tmx and saved"""
+    key = CompiledLevel.get_key(tmx_path)
+    compiled = _compiled_levels.get(tmx_path)
+    if compiled is not None and compiled.key == key:
+        return compiled
+
+    path = get_cache_path(tmx_path)
+    compiled = CompiledLevel.load(path, key) if LEVEL_CACHE else None
+    if compiled is None:
+        compiled = CompiledLevel.compile(tmx_path, key)
+        if LEVEL_CACHE:
+            try:
+                compiled.save(path)
+            except (OSError, TypeError, ValueError, OverflowError, struct.error) as e:
+                # Map properties json cannot encode, grids too large for the header...: play without the cache
+                print(f"[LEVEL CACHE] Could not save {path}: {e}")
+            else:
+                print(f"[LEVEL CACHE] Compiled {os.path.basename(tmx_path)} into {os.path.basename(path)}")
+
+    _compiled_levels[tmx_path] = compiled
+    return compiled
+
+
+if __name__ == "__main__":
+    # Offline compile step: python -m engine.level_cache assets/maps/*.tmx
+    import sys
+
+    for tmx_path in sys.argv[1:]:
+        cache_path = get_cache_path(tmx_path)
+        CompiledLevel.compile(tmx_path, CompiledLevel.get_key(tmx_path)).save(cache_path)
+        print(f"[LEVEL CACHE] Saved {cache_path} ({os.path.getsize(cache_path) / 1024:.1f} KB)")
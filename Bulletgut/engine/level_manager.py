@@ -1,4 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
 from engine.audio_manager import AudioManager
+from engine.level import prepare_level
 
 
 class LevelManager:
@@ -9,6 +11,10 @@ class LevelManager:
         self.audio_manager = AudioManager()  # Gestionnaire audio
         self.current_level_music = None  # Track de la musique actuelle
 
+        # Préchargement du niveau suivant pendant la partie : chemin -> Future de prepare_level()
+        self.preload_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-preload")
+        self.preloaded = {}
+
     def get_current(self):
         """Retourne le chemin du niveau actuel"""
         return self.level_paths[self.index]
@@ -22,6 +28,29 @@ class LevelManager:
             return self.level_paths[self.index + 1]
         return None
 
+    def preload_next(self):
+        """Lance la préparation du niveau suivant (carte, grilles, PVS, tilesets décodés) sur le thread de préchargement"""
+        path = self.get_next()
+        if path and path not in self.preloaded:
+            self.preloaded[path] = self.preload_pool.submit(prepare_level, path)
+            print(f"[PRELOAD] Preparing {path} in the background")
+
+    def take_preloaded(self, path):
+        """Données préparées pour ce niveau (attend la fin du préchargement s'il est en cours), ou None"""
+        future = self.preloaded.pop(path, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"[PRELOAD] Preparing {path} failed, loading it on the main thread: {e}")
+            return None
+
+    def shutdown(self):
+        """Arrête le thread de préchargement sans attendre (retour au menu ou fermeture du jeu)"""
+        self.preload_pool.shutdown(wait=False, cancel_futures=True)
+        self.preloaded.clear()
+
     def advance(self):
         """Avance au niveau suivant (version originale sans musique)"""
         if self.index + 1 < len(self.level_paths):
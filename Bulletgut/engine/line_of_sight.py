@@ -0,0 +1,96 @@
+from data.config import TILE_SIZE, LOS_CACHE_MAX_ENTRIES
+
+
+class LineOfSight:
+    """Tile to tile line of sight, walked once and remembered until a door on the line changes
+
+    A line is a Bresenham walk over the tiles strictly between the two endpoint tiles (an
+    endpoint inside a wall, like a rocket exploding against it, does not hide the line),
+    blocked by walls and doors that block. Pairs of open tiles the PVS already rules out are
+    never walked. Each result remembers the doors the walk went through: when a door starts
+    or stops blocking only those lines are forgotten, everything else stays cached.
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.width = level.map_width
+        self.height = level.map_height
+        self.cache = {}  # (from tile, to tile) -> clear line
+        self.door_lines = {}  # door index -> {(from tile, to tile)} cached lines going through that door
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.cache.clear()
+        self.door_lines.clear()
+
+    def on_door_changed(self, door_index):
+        """Forget the lines through a door that started or stopped blocking"""
+        for key in self.door_lines.pop(door_index, ()):
+            self.cache.pop(key, None)
+
+    def get_tile(self, x, y):
+        tx, ty = int(x // TILE_SIZE), int(y // TILE_SIZE)
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return ty * self.width + tx
+        return None
+
+    def is_clear(self, x0, y0, x1, y1):
+        """No wall or blocking door between world positions (x0, y0) and (x1, y1)"""
+        tile_a = self.get_tile(x0, y0)
+        tile_b = self.get_tile(x1, y1)
+        if tile_a is None or tile_b is None:
+            return False
+
+        key = (tile_a, tile_b)
+        clear = self.cache.get(key)
+        if clear is not None:
+            self.hits += 1
+            return clear
+
+        self.misses += 1
+        if len(self.cache) >= LOS_CACHE_MAX_ENTRIES:
+            self.clear()
+
+        walls = self.level.wall_grid
+        if not walls[tile_a] and not walls[tile_b] and not self.level.pvs.is_tile_visible(tile_a, tile_b):
+            clear, doors = False, ()  # Hidden even with every door open, no door can change that
+        else:
+            clear, doors = self.walk(tile_a, tile_b)
+
+        self.cache[key] = clear
+        for door_index in doors:
+            self.door_lines.setdefault(door_index, set()).add(key)
+        return clear
+
+    def walk(self, tile_a, tile_b):
+        """(clear, door indices crossed up to the first blocking tile) of the line between two tiles"""
+        width = self.width
+        blocked = self.level.blocked_grid
+        door_ids = self.level.door_id_grid
+        x0, y0 = tile_a % width, tile_a // width
+        x1, y1 = tile_b % width, tile_b // width
+
+        dx = abs(x1 - x0)
+        dy = abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx - dy
+        doors = []
+
+        while True:
+            e2 = 2 * err
+            if e2 > -dy:
+                err -= dy
+                x0 += sx
+            if e2 < dx:
+                err += dx
+                y0 += sy
+            if x0 == x1 and y0 == y1:
+                return True, doors
+
+            tile = y0 * width + x0
+            if door_ids[tile] >= 0:
+                doors.append(door_ids[tile])
+            if blocked[tile]:
+                return False, doors
@@ -0,0 +1,93 @@
+import math
+from data.config import FOV
+
+try:
+    import numpy as np
+except ImportError:  # Same results from a plain loop over the enemies
+    np = None
+
+FOV_MARGIN = math.radians(10)  # An enemy this far outside the player's view still counts as in view (sprite width)
+
+
+class Perception:
+    """Where every enemy stands relative to the player, computed for all of them once per frame
+
+    Enemy positions are kept in arrays (row enemy.perception_index, written by EnemyBase.move),
+    update() then fills, per enemy: distance to the player, bearing towards the player (radians),
+    the 8-way sprite direction the player sees (as get_facing_direction), whether the player is
+    within its vision range, whether it is within its wake-up distance, and whether it stands in
+    the player's field of view. Enemy updates read these lists instead of recomputing them.
+    """
+
+    def __init__(self, enemies):
+        self.enemies = enemies
+        for index, enemy in enumerate(enemies):
+            enemy.perception_index = index
+
+        count = len(enemies)
+        if np is not None:
+            self.xs = np.zeros(count)
+            self.ys = np.zeros(count)
+            self.vision_range = np.array([enemy.vision_range for enemy in enemies], dtype=float)
+            self.wake_distance = np.array([enemy.wake_up_distance for enemy in enemies], dtype=float)
+        else:
+            self.xs = [0.0] * count
+            self.ys = [0.0] * count
+        self.reset()
+
+        self.distance = [0.0] * count
+        self.bearing = [0.0] * count
+        self.facing = [0] * count
+        self.in_range = [False] * count
+        self.wake = [False] * count
+        self.in_view = [False] * count
+
+    def reset(self):
+        """Read every enemy position again (level loaded or restarted)"""
+        for enemy in self.enemies:
+            self.move(enemy)
+
+    def move(self, enemy):
+        index = enemy.perception_index
+        self.xs[index] = enemy.x
+        self.ys[index] = enemy.y
+
+    def update(self, player):
+        if not self.enemies:
+            return
+        if np is None:
+            self._update_python(player)
+            return
+
+        px, py = player.x, player.y
+        dx = px - self.xs
+        dy = py - self.ys
+        distance = np.hypot(dx, dy)
+        bearing = np.arctan2(dy, dx)
+        # Direction seen from the player, angle of the player -> enemy vector with y pointing up
+        seen_angle = np.degrees(np.arctan2(dy, -dx)) % 360
+        off_view = np.abs((bearing + math.pi - player.angle + math.pi) % (2 * math.pi) - math.pi)
+
+        self.distance = distance.tolist()
+        self.bearing = bearing.tolist()
+        self.facing = (((seen_angle + 22.5) // 45).astype(int) % 8).tolist()
+        self.in_range = (distance <= self.vision_range).tolist()
+        self.wake = (distance < self.wake_distance).tolist()
+        self.in_view = (off_view <= FOV / 2 + FOV_MARGIN).tolist()
+
+    def _update_python(self, player):
+        px, py = player.x, player.y
+        for index, enemy in enumerate(self.enemies):
+            dx = px - self.xs[index]
+            dy = py - self.ys[index]
+            distance = math.hypot(dx, dy)
+            bearing = math.atan2(dy, dx)
+            seen_angle = math.degrees(math.atan2(dy, -dx)) % 360
+            off_view = abs((bearing + math.pi - player.angle + math.pi) % (2 * math.pi) - math.pi)
+
+            self.distance[index] = distance
+            self.bearing[index] = bearing
+            self.facing[index] = int((seen_angle + 22.5) // 45) % 8
+            self.in_range[index] = distance <= enemy.vision_range
+            self.wake[index] = distance < enemy.wake_up_distance
+            self.in_view[index] = off_view <= FOV / 2 + FOV_MARGIN
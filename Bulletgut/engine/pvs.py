@@ -0,0 +1,254 @@
+import hashlib
+import math
+import os
+import struct
+import threading
+import zlib
+from data.config import TILE_SIZE, PVS_RAY_ANGLES, PVS_RAY_STEP
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy a shipped .pvs file is still loaded, nothing is built
+    np = None
+
+PVS_MAGIC = b"BGPVS2"
+PVS_BUILD_CHUNK = 128  # Source tiles whose rays are marched together (bounds the build memory), a multiple of 8
+
+
+def cast_ray_fans(walls, xs, ys, offsets, angles, step_length, flat_visible):
+    """March rays in every direction from offset points of the source tiles, marking the tiles they cross
+
+    flat_visible is a flattened (len(xs), tile count) bool array, one row per source tile.
+    """
+    height, width = walls.shape
+    count = width * height
+    rays = len(offsets) * len(angles)
+
+    origin_x = (xs[:, None] + offsets[None, :, 0]).repeat(len(angles), axis=1).ravel()
+    origin_y = (ys[:, None] + offsets[None, :, 1]).repeat(len(angles), axis=1).ravel()
+    dir_x = np.tile(np.cos(angles) * step_length, len(xs) * len(offsets))
+    dir_y = np.tile(np.sin(angles) * step_length, len(xs) * len(offsets))
+    source = np.arange(len(xs)).repeat(rays)
+
+    step = 0
+    while len(source):
+        step += 1
+        tx = np.floor(origin_x + dir_x * step).astype(np.intp)
+        ty = np.floor(origin_y + dir_y * step).astype(np.intp)
+        inside = (tx >= 0) & (tx < width) & (ty >= 0) & (ty < height)
+        tile = ty[inside] * width + tx[inside]
+        # The wall that stops a ray is seen too (objects can stand against or inside it)
+        flat_visible[source[inside] * count + tile] = True
+
+        inside[inside] = ~walls.reshape(-1)[tile]
+        origin_x, origin_y, dir_x, dir_y = origin_x[inside], origin_y[inside], dir_x[inside], dir_y[inside]
+        source = source[inside]
+
+
+def widen_rows(rows, height, width):
+    """(sources, tile count) bool rows with the 8 neighbours of every marked tile marked too"""
+    grid = rows.reshape(len(rows), height, width)
+    widened = grid.copy()
+    widened[:, 1:, :] |= grid[:, :-1, :]
+    widened[:, :-1, :] |= grid[:, 1:, :]
+    grid = widened.copy()
+    widened[:, :, 1:] |= grid[:, :, :-1]
+    widened[:, :, :-1] |= grid[:, :, 1:]
+    return widened.reshape(len(rows), -1)
+
+
+def build_table(walls, width, height):
+    """Packed visibility rows of the open tiles of a map, see PotentiallyVisibleSet
+
+    A fan of rays is cast from five points of every open tile, the rows are made symmetric
+    and widened by one tile. Sources are handled PVS_BUILD_CHUNK at a time in full tile rows
+    that are packed straight away, so the build holds two packed open tile tables at most.
+    """
+    walls = np.frombuffer(bytes(walls), dtype=np.uint8).reshape(height, width).astype(bool)
+    count = width * height
+    open_tiles = np.flatnonzero(~walls.reshape(-1))
+    ys, xs = np.divmod(open_tiles, width)
+    open_count = len(open_tiles)
+    stride = (open_count + 7) // 8
+
+    # Centre and four inset corners of each source tile
+    offsets = np.array([(0.5, 0.5), (0.02, 0.02), (0.98, 0.02), (0.02, 0.98), (0.98, 0.98)])
+    angles = np.arange(PVS_RAY_ANGLES) * (2 * math.pi / PVS_RAY_ANGLES)
+
+    def pack(rows):
+        return np.packbits(rows[:, open_tiles], axis=1, bitorder="little")
+
+    # What each source's own rays reach: kept raw for the symmetric pass, widened into the table
+    seen = np.zeros((open_count, stride), dtype=np.uint8)
+    table = np.zeros((open_count, stride), dtype=np.uint8)
+    for first in range(0, open_count, PVS_BUILD_CHUNK):
+        last = min(first + PVS_BUILD_CHUNK, open_count)
+        rows = np.zeros((last - first, count), dtype=bool)
+        rows[np.arange(last - first), open_tiles[first:last]] = True
+        cast_ray_fans(walls, xs[first:last], ys[first:last], offsets, angles, PVS_RAY_STEP, rows.reshape(-1))
+        seen[first:last] = pack(rows)
+        table[first:last] = pack(widen_rows(rows, height, width))
+
+    # Sight is symmetric: a source also sees the open tiles whose rays reached it (its column of seen)
+    for first in range(0, open_count, PVS_BUILD_CHUNK):
+        last = min(first + PVS_BUILD_CHUNK, open_count)
+        columns = np.unpackbits(seen[:, first >> 3:(last + 7) >> 3], axis=1, bitorder="little")[:, :last - first]
+        rows = np.zeros((last - first, count), dtype=bool)
+        rows[:, open_tiles] = columns.T
+        table[first:last] |= pack(widen_rows(rows, height, width))
+
+    return table.tobytes()
+
+
+class PotentiallyVisibleSet:
+    """Tile to tile visibility table: can anything in tile A ever see anything in tile B
+
+    Only walls block; doors are treated as open portals, so the table holds whatever door state.
+    One bit per (open tile, open tile) pair, rows of `stride` bytes in tile order (y * width + x);
+    a wall tile at either end reports visible. A missing table (disabled, or still being built)
+    reports everything as visible.
+    """
+
+    def __init__(self, width, height, walls, bits=None, key=b""):
+        self.width = width
+        self.height = height
+        self.open_index = [-1] * (width * height)  # Tile -> row and column of the table, -1 for walls
+        open_count = 0
+        for tile, wall in enumerate(walls):
+            if not wall:
+                self.open_index[tile] = open_count
+                open_count += 1
+        self.stride = (open_count + 7) // 8
+        self.bits = bits  # bytes, or None when disabled
+        self.key = key
+
+    @classmethod
+    def for_level(cls, tmx_path, walls, width, height):
+        """Load the table saved next to the .tmx, or start building it in the background
+
+        walls is the flat row-major wall grid of the level (one byte per tile, 1 = wall).
+        Tables are built offline (python -m engine.pvs); a map edited since is played without
+        culling until its table, built on a background thread, is saved next to it.
+        """
+        key = cls.get_key(walls, width)
+        path = os.path.splitext(tmx_path)[0] + ".pvs"
+
+        pvs = cls.load(path, walls, key)
+        if pvs is not None:
+            return pvs
+
+        pvs = cls(width, height, walls, key=key)
+        if np is None:
+            print("[PVS] NumPy is not installed and no .pvs file matches this map, visibility culling disabled")
+            return pvs
+
+        print(f"[PVS] Building {os.path.basename(path)} in the background, visibility culling disabled until then "
+              f"(python -m engine.pvs {tmx_path} builds it offline)")
+        threading.Thread(target=pvs.build_in_background, args=(bytes(walls), path), name="pvs-build",
+                         daemon=True).start()
+        return pvs
+
+    @staticmethod
+    def get_key(walls, width):
+        """Hash of the wall grid and build settings, a table is only reused for the same map"""
+        settings = struct.pack("<iid", width, PVS_RAY_ANGLES, PVS_RAY_STEP)
+        return hashlib.sha1(bytes(walls) + settings).digest()
+
+    @classmethod
+    def build(cls, walls, width, height, key=b""):
+        """Build the table of a map right away (the offline compile step)"""
+        pvs = cls(width, height, walls, build_table(walls, width, height), key)
+        print(f"[PVS] Built {width}x{height} table: {pvs.get_visible_ratio() * 100:.1f}% of open tile pairs visible")
+        return pvs
+
+    def build_in_background(self, walls, path):
+        """Thread target of for_level(): fill in the table, then save it for the next load"""
+        try:
+            self.bits = build_table(walls, self.width, self.height)
+            self.save(path)
+        except (OSError, MemoryError) as e:
+            print(f"[PVS] Could not build {path}: {e}")
+            return
+        print(f"[PVS] Built {os.path.basename(path)}: {self.get_visible_ratio() * 100:.1f}% of open tile pairs visible")
+
+    @classmethod
+    def load(cls, path, walls, key):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        header = len(PVS_MAGIC) + 20 + 4
+        if data[:len(PVS_MAGIC)] != PVS_MAGIC or data[len(PVS_MAGIC):len(PVS_MAGIC) + 20] != key:
+            print(f"[PVS] {os.path.basename(path)} is out of date, rebuilding")
+            return None
+
+        width, height = struct.unpack("<HH", data[header - 4:header])
+        pvs = cls(width, height, walls, zlib.decompress(data[header:]), key)
+        print(f"[PVS] Loaded {os.path.basename(path)} ({len(data) / 1024:.1f} KB)")
+        return pvs
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(PVS_MAGIC + self.key + struct.pack("<HH", self.width, self.height))
+            f.write(zlib.compress(self.bits, 9))
+
+    def get_tile(self, x, y):
+        """Tile number of a world position, or None outside the map"""
+        tx, ty = int(x // TILE_SIZE), int(y // TILE_SIZE)
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return ty * self.width + tx
+        return None
+
+    def is_tile_visible(self, tile_a, tile_b):
+        bits = self.bits
+        if bits is None or tile_a is None or tile_b is None:
+            return True
+        a, b = self.open_index[tile_a], self.open_index[tile_b]
+        if a < 0 or b < 0:
+            return True
+        return bits[a * self.stride + (b >> 3)] >> (b & 7) & 1 == 1
+
+    def is_visible(self, x0, y0, x1, y1):
+        """Could anything at world position (x0, y0) see (x1, y1), with every door open"""
+        return self.is_tile_visible(self.get_tile(x0, y0), self.get_tile(x1, y1))
+
+    def filter_visible(self, objects, x, y):
+        """Objects standing in a tile visible from (x, y), before any projection"""
+        tile = self.get_tile(x, y)
+        bits = self.bits
+        if bits is None or tile is None or self.open_index[tile] < 0:
+            return objects
+
+        open_index, row = self.open_index, self.open_index[tile] * self.stride
+        get_tile = self.get_tile
+        visible = []
+        for obj in objects:
+            other = get_tile(obj.x, obj.y)
+            column = -1 if other is None else open_index[other]
+            if column < 0 or bits[row + (column >> 3)] >> (column & 7) & 1:
+                visible.append(obj)
+        return visible
+
+    def get_visible_ratio(self):
+        if self.bits is None:
+            return 1.0
+        open_count = self.width * self.height - self.open_index.count(-1)
+        return sum(bin(byte).count("1") for byte in self.bits) / float(max(1, open_count) ** 2)
+
+
+if __name__ == "__main__":
+    # Offline compile step: python -m engine.pvs assets/maps/*.tmx
+    import sys
+    import pytmx
+
+    for tmx_path in sys.argv[1:]:
+        tmx_data = pytmx.TiledMap(tmx_path)
+        walls_layer = tmx_data.get_layer_by_name("Walls")
+        walls = bytes(1 if walls_layer.data[y][x] else 0 for y in range(tmx_data.height) for x in range(tmx_data.width))
+        table = PotentiallyVisibleSet.build(walls, tmx_data.width, tmx_data.height,
+                                            PotentiallyVisibleSet.get_key(walls, tmx_data.width))
+        pvs_path = os.path.splitext(tmx_path)[0] + ".pvs"
+        table.save(pvs_path)
+        print(f"[PVS] Saved {pvs_path} ({os.path.getsize(pvs_path) / 1024:.1f} KB)")
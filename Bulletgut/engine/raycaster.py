@@ -1,118 +1,434 @@
 import pygame as pg
 import math
-from data.config import SCREEN_WIDTH, SCREEN_HEIGHT, FOV, WALL_HEIGHT_SCALE, TILE_SIZE, PICKUP_SCALE
+import os
+from concurrent.futures import ThreadPoolExecutor
+from data.config import SCREEN_WIDTH, FOV, WALL_HEIGHT_SCALE, TILE_SIZE, WALL_KERNEL, RENDER_BACKEND, \
+    RESOLUTION_PRESETS, RESOLUTION_PRESET, RENDER_WORKERS
+from engine.frame_buffer import FrameBuffer
+from engine.sprite_cache import sprite_cache
+from engine.billboard import project_billboards
+from engine.wall_cache import WallCache
+from engine.zbuffer import ZBuffer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the python kernel does not need it
+    np = None
 
 
 class Raycaster:
     def __init__(self, level, player):
         self.level = level
         self.player = player
-        self.num_rays = SCREEN_WIDTH // 2
         self.wall_height_scale = 1.0
-        self.fov = FOV
         self.max_depth = 800
-        self.z_buffer = [float('inf')] * SCREEN_WIDTH  # Store depth for each screen column
+        self.z_buffer = ZBuffer(SCREEN_WIDTH)  # Store depth for each screen column
+
+        # Per-resolution ray tables, rebuilt by set_resolution()
+        self.fov = FOV
+        self.set_resolution_preset(RESOLUTION_PRESET)
+
+        # Vertical render scale: below 1.0 floor and walls are cast into a shorter offscreen view,
+        # then upscaled into the screen before the sprites are drawn
+        self.render_scale = 1.0
+        self.view_surface = None
+
+        # Wall layer of the last frame, reused while the player stands still
+        self.wall_cache = WallCache()
+
+        # Strip-parallel casting: the numpy kernel runs render_workers bands of rays on a thread pool,
+        # created on first use and shut down by close() when the raycaster is replaced
+        self.render_workers = 1
+        self.strip_pool = None
+        self.set_render_workers(RENDER_WORKERS)
+
+        # Wall casting kernel, "python" (ray by ray) or "numpy" (whole frame at once)
+        self.wall_kernel = "python"
+        self._door_ids = None
+        self._solid = None
+        self._gid_grid = None
+        if np is not None:
+            # Views of the level grids, door changes show up in them without any copy
+            self._door_ids = level.grid_view(level.door_id_grid)
+            self._solid = level.grid_view(level.blocked_grid).view(bool)
+            self._gid_grid = level.grid_view(level.gid_grid)
+        self.set_wall_kernel(WALL_KERNEL)
+
+        # Render backend, "surface" (column blits) or "buffer" (whole-frame NumPy pixel buffer)
+        self.render_backend = "surface"
+        self.frame_buffer = None
+        self.set_render_backend(RENDER_BACKEND)
+
+    def set_resolution(self, num_rays=None, fov=None):
+        """Rebuild the camera ray tables for a new ray count and/or FOV
+
+        Ray i looks at player_angle + ray_offsets[i]: its direction is the player direction
+        rotated by (ray_cos[i], ray_sin[i]) and its fisheye correction is ray_fisheye[i].
+        """
+        self.num_rays = max(1, min(int(num_rays or self.num_rays), SCREEN_WIDTH))
+        self.fov = fov or self.fov
+        self.ray_width = SCREEN_WIDTH // self.num_rays
+        self.wall_projection = 40000 * WALL_HEIGHT_SCALE
+
+        delta_angle = self.fov / self.num_rays
+        self.ray_offsets = [-self.fov / 2 + ray * delta_angle for ray in range(self.num_rays)]
+        self.ray_cos = [math.cos(offset) for offset in self.ray_offsets]
+        self.ray_sin = [math.sin(offset) for offset in self.ray_offsets]
+        # cos(player_angle - ray_angle) only depends on the offset
+        self.ray_fisheye = self.ray_cos
+        if np is not None:
+            self._ray_cos = np.array(self.ray_cos)
+            self._ray_sin = np.array(self.ray_sin)
+            self._ray_fisheye = self._ray_cos
+
+        # A wall at depth d spans d / rays_per_radian texels per ray
+        self.rays_per_radian = self.num_rays / 2 / math.tan(self.fov / 2)
+
+        return self.num_rays
+
+    def get_mip_distances(self, projection):
+        """Depths from which walls sample each mip level, mip level L past mip_distances[L - 1]
+
+        A column of depth d spans d / rays_per_radian texels per ray across and TILE_SIZE * d / projection
+        texels per pixel down: level L is only used once both are above 2^L, so tall walls close to
+        the camera keep their full vertical detail even when the rays are sparse.
+        """
+        one_texel_depth = max(self.rays_per_radian, projection / TILE_SIZE)  # Depth of 1 texel per ray and per pixel
+        return [one_texel_depth * 2 ** level for level in range(1, self.level.texture_cache.mip_levels)]
+
+    def set_resolution_preset(self, preset):
+        self.resolution_preset = preset
+        self.set_resolution(RESOLUTION_PRESETS[preset])
+        print(f"[RAYCASTER] Resolution: {preset}, {self.num_rays} rays of {self.ray_width}px, "
+              f"FOV {math.degrees(self.fov):.0f}°")
+        return self.num_rays
+
+    def cycle_resolution_preset(self):
+        presets = list(RESOLUTION_PRESETS)
+        index = presets.index(self.resolution_preset) if self.resolution_preset in presets else -1
+        preset = presets[(index + 1) % len(presets)]
+        self.set_resolution_preset(preset)
+        return preset
 
     def cast_rays(self, screen, player, color):
-        # Reset z-buffer for new frame
-        self.z_buffer = [float('inf')] * SCREEN_WIDTH
+        view = self.get_view_surface(screen)
 
-        self.render_floor(screen, color)
-        self.render_walls(screen, player)
+        # Everything the wall layer depends on, doors apart
+        view_key = (player.get_position(), player.get_angle(), self.num_rays, self.fov, self.render_scale,
+                    self.render_backend, self.wall_kernel, tuple(color), view.get_size())
+        door_progress = tuple(door.progress for door in self.level.doors)
+        moved_doors = self.wall_cache.get_moved_doors(view_key, door_progress)
+
+        if moved_doors is None:
+            # Reset z-buffer for new frame
+            self.z_buffer.clear()
+
+            if self.render_backend == "buffer":
+                self.render_frame_buffer(view, player, color)
+                layer = self.frame_buffer.pixels.copy()
+            else:
+                self.render_floor(view, color)
+                self.render_walls(view, player)
+                layer = view.copy()
+            self.wall_cache.store(view_key, door_progress, self.z_buffer.copy(), layer)
+        else:
+            # Same view: previous wall layer, only the columns of moving doors are cast again
+            self.z_buffer.set_state(self.wall_cache.z_buffer)
+            self.restore_wall_layer(view)
+            if moved_doors:
+                doors = [self.level.doors[index] for index in moved_doors]
+                for first_ray, last_ray in self.get_door_rays(doors, player):
+                    self.redraw_rays(view, player, color, first_ray, last_ray)
+                self.wall_cache.store(view_key, door_progress, self.z_buffer.copy(), self.wall_cache.layer)
+
+        if view is not screen:
+            # Sprites are drawn at full resolution on top of the upscaled view
+            self.present(view)
+            pg.transform.scale(view, screen.get_size(), screen)
+
+    def restore_wall_layer(self, view):
+        if self.render_backend == "buffer":
+            self.frame_buffer.pixels[:] = self.wall_cache.layer
+            self.frame_buffer.pending = True
+        else:
+            view.blit(self.wall_cache.layer, (0, 0))
+
+    def redraw_rays(self, view, player, color, first_ray, last_ray):
+        """Cast rays first_ray to last_ray again and redraw their columns over the cached wall layer"""
+        if self.wall_kernel == "numpy" and np is not None:
+            arrays = self.cast_wall_arrays(player, first_ray, last_ray)
+            columns = list(zip(*(values.tolist() for values in arrays)))
+        else:
+            columns = self.cast_walls(player, first_ray, last_ray)
+
+        left = first_ray * self.ray_width
+        if self.render_backend == "buffer":
+            projection = self.wall_projection * self.render_scale
+            depth = self.frame_buffer.draw_walls(columns, self.level.texture_cache, self.ray_width, projection,
+                                                 first_ray, self.get_mip_distances(projection))
+            right = left + len(depth)
+            self.z_buffer.set_columns(left, depth)
+            self.wall_cache.layer[left:right] = self.frame_buffer.pixels[left:right]
+            return
+
+        right = min(last_ray * self.ray_width, SCREEN_WIDTH)
+        height = view.get_height()
+        area = pg.Rect(left, 0, right - left, height)
+        view.set_clip(area)
+        view.fill((0, 0, 0), area)
+        view.fill(color, (left, height // 2, right - left, height // 2))
+        self.draw_wall_columns(view, columns, first_ray)
+        view.set_clip(None)
+        self.wall_cache.layer.blit(view, area, area)
+
+    def get_door_rays(self, doors, player):
+        """Merged (first_ray, last_ray) ranges of the rays crossing the tiles of these doors"""
+        ox, oy = player.get_position()
+        angle = player.get_angle()
+        step = self.fov / self.num_rays
+        ranges = []
+        for door in doors:
+            x0, y0 = door.grid_x * TILE_SIZE, door.grid_y * TILE_SIZE
+            if x0 <= ox <= x0 + TILE_SIZE and y0 <= oy <= y0 + TILE_SIZE:
+                return [(0, self.num_rays)]
+
+            deltas = [(math.atan2(y - oy, x - ox) - angle + math.pi) % (2 * math.pi) - math.pi
+                      for x, y in ((x0, y0), (x0 + TILE_SIZE, y0), (x0, y0 + TILE_SIZE),
+                                   (x0 + TILE_SIZE, y0 + TILE_SIZE))]
+            if max(deltas) - min(deltas) > math.pi:
+                return [(0, self.num_rays)]  # Tile right next to the player, seen across the +/- pi seam
+
+            first_ray = max(0, int((min(deltas) + self.fov / 2) // step))
+            # Door columns are drawn wider than a ray and spill over the next ones
+            spill = int(door.thickness * TILE_SIZE) // self.ray_width + 1
+            last_ray = min(self.num_rays, int((max(deltas) + self.fov / 2) // step) + 1 + spill)
+            if first_ray < last_ray:
+                ranges.append((first_ray, last_ray))
+
+        merged = []
+        for first_ray, last_ray in sorted(ranges):
+            if merged and first_ray <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], last_ray))
+            else:
+                merged.append((first_ray, last_ray))
+        return merged
+
+    def get_view_surface(self, screen):
+        """Surface the walls are cast into: the screen itself, or a shorter one when render_scale < 1"""
+        if self.render_scale >= 1.0:
+            return screen
+
+        size = (screen.get_width(), max(1, int(screen.get_height() * self.render_scale)))
+        if self.view_surface is None or self.view_surface.get_size() != size:
+            self.view_surface = pg.Surface(size).convert(screen)
+        return self.view_surface
+
+    def set_render_workers(self, workers):
+        """Number of vertical bands cast in parallel by the numpy kernel (1 = main thread only)"""
+        if workers > 1 and np is None:
+            print("[RAYCASTER] NumPy is not installed, strip rendering disabled")
+            workers = 1
+        if workers > 1 and (os.cpu_count() or 1) <= 1:
+            print("[RAYCASTER] Single CPU, strip rendering disabled")
+            workers = 1
+        workers = max(1, int(workers))
+        if workers != self.render_workers:
+            self.close()
+        self.render_workers = workers
+        return self.render_workers
+
+    def get_strip_pool(self):
+        if self.strip_pool is None:
+            self.strip_pool = ThreadPoolExecutor(max_workers=self.render_workers, thread_name_prefix="raycast")
+        return self.strip_pool
+
+    def close(self):
+        """Shut the strip thread pool down (raycaster replaced or game closed)"""
+        if self.strip_pool is not None:
+            self.strip_pool.shutdown(wait=False)
+            self.strip_pool = None
+
+    def cast_wall_strips(self, player, draw=None):
+        """Cast the rays in render_workers vertical bands on the thread pool
+
+        NumPy releases the GIL inside its array operations, so the bands overlap.
+        draw(first_ray, arrays), if given, also runs on the worker once its band is cast.
+        Returns (arrays, draw result) for every band, in screen order.
+        """
+        bounds = np.linspace(0, self.num_rays, self.render_workers + 1).astype(int).tolist()
+
+        def cast_band(first_ray, last_ray):
+            arrays = self.cast_wall_arrays(player, first_ray, last_ray)
+            return arrays, draw(first_ray, arrays) if draw else None
+
+        pool = self.get_strip_pool()
+        futures = [pool.submit(cast_band, first_ray, last_ray)
+                   for first_ray, last_ray in zip(bounds[:-1], bounds[1:]) if last_ray > first_ray]
+        return [future.result() for future in futures]
+
+    def set_render_scale(self, scale):
+        """Vertical render scale of the walls and floor, 1.0 for full resolution"""
+        self.render_scale = max(0.25, min(1.0, scale))
+        return self.render_scale
+
+    def render_frame_buffer(self, screen, player, color):
+        """Floor and walls written straight into the pixel buffer, shown later by present()"""
+        if self.frame_buffer is None or self.frame_buffer.pixels.shape != screen.get_size():
+            self.frame_buffer = FrameBuffer(screen)
+
+        self.frame_buffer.clear(color)
+        texture_cache = self.level.texture_cache
+        projection = self.wall_projection * self.render_scale
+        mip_distances = self.get_mip_distances(projection)
+
+        if self.wall_kernel == "numpy" and self.render_workers > 1:
+            # Texture tables are built before the workers share them
+            self.frame_buffer.get_texel_columns(texture_cache)
+
+            def draw_band(first_ray, arrays):
+                return self.frame_buffer.draw_walls(np.column_stack(arrays), texture_cache, self.ray_width,
+                                                    projection, first_ray, mip_distances)
+
+            depth = np.concatenate([band_depth for _, band_depth in self.cast_wall_strips(player, draw_band)])
+        else:
+            if self.wall_kernel == "numpy":
+                columns = list(self.cast_walls_numpy(player))
+            else:
+                columns = self.cast_walls(player)
+            depth = self.frame_buffer.draw_walls(columns, texture_cache, self.ray_width, projection,
+                                                 mip_distances=mip_distances)
+
+        self.frame_buffer.fill_background(len(depth))
+        self.z_buffer.set_columns(0, depth)
+        self.frame_buffer.pending = True
+
+    def present(self, screen):
+        """Push the pixel buffer to the screen, nothing to do for the surface backend"""
+        if self.render_backend == "buffer" and self.frame_buffer is not None and self.frame_buffer.pending:
+            self.frame_buffer.present(screen)
+            self.frame_buffer.pending = False
+
+    def set_render_backend(self, backend):
+        """Select the render backend ("surface" or "buffer") at runtime"""
+        if backend == "buffer" and np is None:
+            print("[RAYCASTER] NumPy is not installed, keeping the surface backend")
+            backend = "surface"
+        self.render_backend = backend
+        print(f"[RAYCASTER] Render backend: {self.render_backend}")
+        return self.render_backend
+
+    def cycle_render_backend(self):
+        return self.set_render_backend("buffer" if self.render_backend == "surface" else "surface")
 
     @staticmethod
     def render_floor(screen, color):
         height = screen.get_height()
         pg.draw.rect(screen, color, (0, height // 2, SCREEN_WIDTH, height // 2))
 
-    def handle_door_intersection(self, ox, oy, angle):
-        """FIXED: Door intersection that works for all door states"""
-        closest_door = None
-        closest_depth = float("inf")
-        tex_x = 0
-        side = None
-
-        for door in self.level.doors:
-            # CRITICAL FIX: Check doors in ALL states except completely invisible
-            # Don't skip closed doors!
-            if door.progress >= 0.95:  # Only skip when almost fully open
-                continue
-
-            # Use door's grid position directly for closed doors
+    @staticmethod
+    def get_door_ray_bounds(door):
+        """Bounds a ray is tested against, None when the door is (almost) fully open"""
+        # CRITICAL FIX: Check doors in ALL states except completely invisible
+        # Don't skip closed doors!
+        if door.progress >= 0.95:  # Only skip when almost fully open
+            return None
+
+        # For closed doors, use full tile bounds
+        if door.progress <= 0.05:  # Fully closed
             door_world_x = door.grid_x * TILE_SIZE
             door_world_y = door.grid_y * TILE_SIZE
-
-            # For closed doors, use full tile bounds
-            if door.progress <= 0.05:  # Fully closed
-                bounds = {
-                    "min_x": door_world_x,
-                    "max_x": door_world_x + TILE_SIZE,
-                    "min_y": door_world_y,
-                    "max_y": door_world_y + TILE_SIZE
-                }
-            else:
-                # Use calculated bounds for opening doors
-                bounds = door.get_door_bounds()
-
-            if not bounds:
-                continue
-
-            # Test intersection with door bounds
-            if door.axis == "x":
-                # Horizontal door
-                if abs(math.cos(angle)) < 1e-6:
+            return {
+                "min_x": door_world_x,
+                "max_x": door_world_x + TILE_SIZE,
+                "min_y": door_world_y,
+                "max_y": door_world_y + TILE_SIZE
+            }
+
+        # Use calculated bounds for opening doors
+        return door.get_door_bounds()
+
+    def intersect_door_dir(self, door, ox, oy, cos_a, sin_a):
+        """Intersect one ray, given by its direction vector, with one door: (depth, tex_x, side) or None"""
+        bounds = self.get_door_ray_bounds(door)
+        if not bounds:
+            return None
+
+        closest = None
+
+        # Test intersection with door bounds
+        if door.axis == "x":
+            # Horizontal door
+            if abs(cos_a) < 1e-6:
+                return None
+
+            for face_x in [bounds["min_x"], bounds["max_x"]]:
+                t = (face_x - ox) / cos_a
+                if t <= 0:
                     continue
 
-                for face_x in [bounds["min_x"], bounds["max_x"]]:
-                    t = (face_x - ox) / math.cos(angle)
-                    if t <= 0:
-                        continue
-
-                    hit_y = oy + t * math.sin(angle)
-                    if bounds["min_y"] <= hit_y <= bounds["max_y"] and t < closest_depth:
-                        closest_door = door
-                        closest_depth = t
-                        side = "x"
+                hit_y = oy + t * sin_a
+                if bounds["min_y"] <= hit_y <= bounds["max_y"] and (closest is None or t < closest[0]):
+                    # Simple texture calculation
+                    rel_y = (hit_y - bounds["min_y"]) / max(1, bounds["max_y"] - bounds["min_y"])
+                    closest = (t, int(rel_y * TILE_SIZE) % TILE_SIZE, "x")
 
-                        # Simple texture calculation
-                        rel_y = (hit_y - bounds["min_y"]) / max(1, bounds["max_y"] - bounds["min_y"])
-                        tex_x = int(rel_y * TILE_SIZE) % TILE_SIZE
+        else:  # Vertical door
+            if abs(sin_a) < 1e-6:
+                return None
 
-            else:  # Vertical door
-                if abs(math.sin(angle)) < 1e-6:
+            for face_y in [bounds["min_y"], bounds["max_y"]]:
+                t = (face_y - oy) / sin_a
+                if t <= 0:
                     continue
 
-                for face_y in [bounds["min_y"], bounds["max_y"]]:
-                    t = (face_y - oy) / math.sin(angle)
-                    if t <= 0:
-                        continue
-
-                    hit_x = ox + t * math.cos(angle)
-                    if bounds["min_x"] <= hit_x <= bounds["max_x"] and t < closest_depth:
-                        closest_door = door
-                        closest_depth = t
-                        side = "y"
-
-                        # Simple texture calculation
-                        rel_x = (hit_x - bounds["min_x"]) / max(1, bounds["max_x"] - bounds["min_x"])
-                        tex_x = int(rel_x * TILE_SIZE) % TILE_SIZE
+                hit_x = ox + t * cos_a
+                if bounds["min_x"] <= hit_x <= bounds["max_x"] and (closest is None or t < closest[0]):
+                    # Simple texture calculation
+                    rel_x = (hit_x - bounds["min_x"]) / max(1, bounds["max_x"] - bounds["min_x"])
+                    closest = (t, int(rel_x * TILE_SIZE) % TILE_SIZE, "y")
 
-        return closest_door, closest_depth, tex_x, side
+        return closest
 
     def render_walls(self, screen, player):
         """Simplified wall rendering that properly handles doors"""
+        if self.wall_kernel == "numpy" and np is not None and self.render_workers > 1:
+            bands = [arrays for arrays, _ in self.cast_wall_strips(player)]
+            depth, gid, tex_x, render_width = (np.concatenate(parts).tolist() for parts in zip(*bands))
+            columns = zip(depth, gid, tex_x, render_width)
+        elif self.wall_kernel == "numpy" and np is not None:
+            columns = self.cast_walls_numpy(player)
+        else:
+            columns = self.cast_walls(player)
+
+        self.draw_wall_columns(screen, columns)
+
+    def set_wall_kernel(self, kernel):
+        """Select the wall casting kernel ("python" or "numpy") at runtime"""
+        if kernel == "numpy" and np is None:
+            print("[RAYCASTER] NumPy is not installed, keeping the python kernel")
+            kernel = "python"
+        self.wall_kernel = kernel
+        print(f"[RAYCASTER] Wall kernel: {self.wall_kernel}")
+        return self.wall_kernel
+
+    def cycle_wall_kernel(self):
+        return self.set_wall_kernel("numpy" if self.wall_kernel == "python" else "python")
+
+    def cast_walls(self, player, first_ray=0, last_ray=None):
+        """Cast every ray one at a time, returns (depth, gid, tex_x, render_width) per ray"""
         ox, oy = player.get_position()
         map_x = int(ox // TILE_SIZE)
         map_y = int(oy // TILE_SIZE)
 
-        angle = player.get_angle() - self.fov / 2
-        angle = angle % (2 * math.pi)
-        delta_angle = self.fov / self.num_rays
-        ray_width = SCREEN_WIDTH // self.num_rays
+        # Ray directions are the player direction rotated by the precomputed offsets
+        player_cos = math.cos(player.get_angle())
+        player_sin = math.sin(player.get_angle())
+        ray_width = self.ray_width
 
-        for ray in range(self.num_rays):
-            sin_a = math.sin(angle)
-            cos_a = math.cos(angle)
+        columns = []
+        for ray in range(first_ray, self.num_rays if last_ray is None else last_ray):
+            cos_a = player_cos * self.ray_cos[ray] - player_sin * self.ray_sin[ray]
+            sin_a = player_sin * self.ray_cos[ray] + player_cos * self.ray_sin[ray]
             dx = 1 if cos_a >= 0 else -1
             dy = 1 if sin_a >= 0 else -1
 
@@ -136,8 +452,14 @@ class Raycaster:
             tile_x, tile_y = map_x, map_y
             side = None
 
-            # Check for door intersection FIRST
-            door_obj, door_depth, door_tex_x, door_side = self.handle_door_intersection(ox, oy, angle)
+            # Door in the player's own tile, the DDA only sees the tiles it enters
+            door_obj, door_depth, door_tex_x = None, float("inf"), 0
+            door = self.level.get_door_at_tile(tile_x, tile_y)
+            if door:
+                hit = self.intersect_door_dir(door, ox, oy, cos_a, sin_a)
+                if hit:
+                    door_obj = door
+                    door_depth, door_tex_x, _ = hit
 
             # DDA for walls
             wall_hit = False
@@ -151,6 +473,16 @@ class Raycaster:
                     tile_y += dy
                     side = 'y'
 
+                # Door geometry is only tested when the ray enters a door tile,
+                # the first door hit is the closest one
+                if door_obj is None:
+                    door = self.level.get_door_at_tile(tile_x, tile_y)
+                    if door:
+                        hit = self.intersect_door_dir(door, ox, oy, cos_a, sin_a)
+                        if hit:
+                            door_obj = door
+                            door_depth, door_tex_x, _ = hit
+
                 wx = tile_x * TILE_SIZE + TILE_SIZE / 2
                 wy = tile_y * TILE_SIZE + TILE_SIZE / 2
 
@@ -194,245 +526,241 @@ class Raycaster:
                     tex_x = TILE_SIZE - tex_x - 1
 
             # Fisheye correction
-            depth *= math.cos(player.get_angle() - angle)
-            wall_height = (40000 / (depth + 0.0001)) * WALL_HEIGHT_SCALE
-
-            # Z-buffer
-            screen_x = ray * ray_width
-            for x in range(screen_x, min(screen_x + ray_width, SCREEN_WIDTH)):
-                self.z_buffer[x] = depth
-
-            # Render
-            tile_img = self.level.tmx_data.get_tile_image_by_gid(gid)
-            if tile_img:
-                texture = pg.transform.scale(tile_img, (TILE_SIZE, TILE_SIZE))
-                tex_x = max(0, min(tex_x, TILE_SIZE - 1))
-                texture_column = texture.subsurface(tex_x, 0, 1, TILE_SIZE)
-
-                height = screen.get_height()
-                safe_height = max(1, min(int(wall_height), height * 2))
-                column = pg.transform.scale(texture_column, (render_width, safe_height))
-
-                column_y = (height - safe_height) // 2
-                x = ray * ray_width
-                screen.blit(column, (x, column_y))
-
-            angle += delta_angle
-
-    def get_door_at_position(self, wx, wy):
-        """Get door object at world position"""
-        grid_x = int(wx // TILE_SIZE)
-        grid_y = int(wy // TILE_SIZE)
+            depth *= self.ray_fisheye[ray]
+            columns.append((depth, gid, tex_x, render_width))
 
-        for door in self.level.doors:
-            if door.grid_x == grid_x and door.grid_y == grid_y:
-                return door
-        return None
+        return columns
 
-    def get_door_texture_gid(self, door):
-        """Get appropriate texture GID for door"""
-        # Try to get door-specific texture
-        is_closed = door.progress <= 0.1
-        gid = self.level.get_door_gid(door, closed=is_closed)
+    def cast_walls_numpy(self, player):
+        """Cast all rays of the frame at once against a NumPy copy of the collision grid"""
+        depth, gid, tex_x, render_width = self.cast_wall_arrays(player)
+        return zip(depth.tolist(), gid.tolist(), tex_x.tolist(), render_width.tolist())
 
-        if gid and gid > 0:
-            return gid
+    def cast_wall_arrays(self, player, first_ray=0, last_ray=None):
+        """Vectorized DDA for rays first_ray to last_ray (excluded), returns depth, gid, tex_x, render_width arrays
 
-        # Fallback: use door's original tile texture
-        door_wx = door.grid_x * TILE_SIZE + TILE_SIZE // 2
-        door_wy = door.grid_y * TILE_SIZE + TILE_SIZE // 2
-        base_gid = self.level.get_gid(door_wx, door_wy)
+        Only reads shared state, so several bands of rays can be cast at the same time.
+        """
+        last_ray = self.num_rays if last_ray is None else last_ray
+        num_rays = last_ray - first_ray
+        ray_cos = self._ray_cos[first_ray:last_ray]
+        ray_sin = self._ray_sin[first_ray:last_ray]
 
-        if base_gid and base_gid > 0:
-            return base_gid
-
-        # Last fallback: use a default door texture (you may need to adjust this)
-        return 1  # Replace with your default door texture GID
-
-    def render_enemies(self, screen, player, enemies):
         ox, oy = player.get_position()
-        angle = player.get_angle()
-
-        size_reduction_factor = 0.55
-
-        sorted_enemies = []
-        for enemy in enemies:
-            ex, ey = enemy.x, enemy.y
-            dx, dy = ex - ox, ey - oy
-            dist = math.hypot(dx, dy)
-            sorted_enemies.append((enemy, dist))
-
-        sorted_enemies.sort(key=lambda x: x[1], reverse=True)
-
-        for enemy, dist in sorted_enemies:
-            ex, ey = enemy.x, enemy.y
-            dx, dy = ex - ox, ey - oy
-
-            dir_angle = math.atan2(dy, dx)
-            delta = (dir_angle - angle + math.pi) % (2 * math.pi) - math.pi
-            if abs(delta) > self.fov / 2:
-                continue
-
-            screen_x = int((0.5 + delta / self.fov) * SCREEN_WIDTH)
-            corrected_dist = dist * math.cos(delta)
-
-            enemy_img = enemy.get_sprite(player.x, player.y)
-            if not enemy_img:
-                continue
-
-            wall_height = (40000 / (corrected_dist + 0.0001)) * WALL_HEIGHT_SCALE
-
-            wall_height *= size_reduction_factor
-
-            original_width, original_height = enemy_img.get_size()
-            aspect_ratio = original_width / original_height
-
-            img_height = int(wall_height)
-            img_width = int(img_height * aspect_ratio)
-
-            max_size = SCREEN_WIDTH // 3
-            if img_width > max_size or img_height > max_size:
-                scale_factor = max_size / max(img_width, img_height)
-                img_width = int(img_width * scale_factor)
-                img_height = int(img_height * scale_factor)
-
-            left_x = max(0, screen_x - img_width // 2)
-            right_x = min(SCREEN_WIDTH - 1, screen_x + img_width // 2)
-
-            visible = False
-            for x in range(left_x, right_x + 1):
-                if 0 <= x < SCREEN_WIDTH and corrected_dist < self.z_buffer[x]:
-                    visible = True
-                    break
-
-            if not visible:
-                continue
+        player_angle = player.get_angle()
+        map_x = int(ox // TILE_SIZE)
+        map_y = int(oy // TILE_SIZE)
+        ray_width = self.ray_width
+
+        # Ray directions are the player direction rotated by the precomputed offsets
+        player_cos, player_sin = math.cos(player_angle), math.sin(player_angle)
+        cos_a = player_cos * ray_cos - player_sin * ray_sin
+        sin_a = player_sin * ray_cos + player_cos * ray_sin
+        dx = np.where(cos_a >= 0, 1, -1)
+        dy = np.where(sin_a >= 0, 1, -1)
+
+        delta_dist_x = np.abs(TILE_SIZE / (cos_a + 1e-6))
+        delta_dist_y = np.abs(TILE_SIZE / (sin_a + 1e-6))
+        side_dist_x = np.where(dx > 0,
+                               ((map_x + 1) * TILE_SIZE - ox) / (cos_a + 1e-6),
+                               (ox - map_x * TILE_SIZE) / (-cos_a + 1e-6))
+        side_dist_y = np.where(dy > 0,
+                               ((map_y + 1) * TILE_SIZE - oy) / (sin_a + 1e-6),
+                               (oy - map_y * TILE_SIZE) / (-sin_a + 1e-6))
+
+        # DDA for walls, every active ray advances one cell per iteration
+        solid = self._solid
+        grid_h, grid_w = solid.shape
+        tile_x = np.full(num_rays, map_x)
+        tile_y = np.full(num_rays, map_y)
+        side_x = np.zeros(num_rays, dtype=bool)
+        active = np.arange(num_rays)
+
+        door_index = np.full(num_rays, -1)
+        door_depth = np.full(num_rays, float("inf"))
+        door_tex_x = np.zeros(num_rays, dtype=int)
+        self._hit_door_tiles(active, tile_x, tile_y, ox, oy, sin_a, cos_a, door_index, door_depth, door_tex_x)
+
+        for _ in range(grid_w + grid_h + 2):
+            if not active.size:
+                break
+            step_x = side_dist_x[active] < side_dist_y[active]
+            ray_x = active[step_x]
+            ray_y = active[~step_x]
+            side_dist_x[ray_x] += delta_dist_x[ray_x]
+            tile_x[ray_x] += dx[ray_x]
+            side_dist_y[ray_y] += delta_dist_y[ray_y]
+            tile_y[ray_y] += dy[ray_y]
+            side_x[active] = step_x
+
+            self._hit_door_tiles(active, tile_x, tile_y, ox, oy, sin_a, cos_a, door_index, door_depth, door_tex_x)
+
+            tx = tile_x[active]
+            ty = tile_y[active]
+            inside = (tx >= 0) & (tx < grid_w) & (ty >= 0) & (ty < grid_h)
+            hit = ~inside
+            hit[inside] = solid[ty[inside], tx[inside]]
+            active = active[~hit]
+
+        # Wall distance and texture
+        wall_depth = np.where(
+            side_x,
+            np.abs((tile_x * TILE_SIZE - ox + (1 - dx) * TILE_SIZE / 2) / (cos_a + 1e-6)),
+            np.abs((tile_y * TILE_SIZE - oy + (1 - dy) * TILE_SIZE / 2) / (sin_a + 1e-6)))
+        hit_pos = np.where(side_x, oy + wall_depth * sin_a, ox + wall_depth * cos_a)
+        wall_tex_x = (hit_pos % TILE_SIZE).astype(int)
+        flip = (side_x & (dx < 0)) | (~side_x & (dy > 0))
+        wall_tex_x = np.where(flip, TILE_SIZE - wall_tex_x - 1, wall_tex_x)
+
+        # Rays that left the map hit the outer edge, which has no texture (GID 0)
+        inside = (tile_x >= 0) & (tile_x < grid_w) & (tile_y >= 0) & (tile_y < grid_h)
+        wall_gid = np.where(inside, self._gid_grid[np.clip(tile_y, 0, grid_h - 1), np.clip(tile_x, 0, grid_w - 1)], 0)
+
+        use_door = (door_index >= 0) & (door_depth < wall_depth)
+
+        doors = self.level.doors
+        door_gid = np.array([self._gid_grid[door.grid_y, door.grid_x] for door in doors] + [0])
+        door_width = np.array([max(1, door.get_door_thickness_px()) for door in doors] + [ray_width])
+
+        depth = np.where(use_door, door_depth, wall_depth)
+        # Fisheye correction
+        depth *= self._ray_fisheye[first_ray:last_ray]
+
+        gid = np.where(use_door, door_gid[door_index], wall_gid)
+        tex_x = np.where(use_door, door_tex_x, wall_tex_x)
+        render_width = np.where(use_door, door_width[door_index], ray_width)
+
+        return depth, gid, tex_x, render_width
+
+    def _hit_door_tiles(self, rays, tile_x, tile_y, ox, oy, sin_a, cos_a, door_index, door_depth, door_tex_x):
+        """Test door geometry for the rays that just entered a door tile and have not hit a door yet"""
+        grid_h, grid_w = self._door_ids.shape
+        tx = tile_x[rays]
+        ty = tile_y[rays]
+        inside = (tx >= 0) & (tx < grid_w) & (ty >= 0) & (ty < grid_h)
+        rays = rays[inside]
+        doors_here = self._door_ids[ty[inside], tx[inside]]
+
+        candidates = (doors_here >= 0) & (door_index[rays] < 0)
+        if not candidates.any():
+            return
+
+        rays = rays[candidates]
+        doors_here = doors_here[candidates]
+        for index in np.unique(doors_here):
+            door_rays = rays[doors_here == index]
+            depth, tex_x = self._intersect_door_numpy(self.level.doors[index], ox, oy,
+                                                      sin_a[door_rays], cos_a[door_rays])
+            hit = depth < float("inf")
+            door_index[door_rays[hit]] = index
+            door_depth[door_rays[hit]] = depth[hit]
+            door_tex_x[door_rays[hit]] = tex_x[hit]
+
+    def _intersect_door_numpy(self, door, ox, oy, sin_a, cos_a):
+        """Vectorized intersect_door for a batch of rays, misses have an infinite depth"""
+        closest_depth = np.full(sin_a.shape, float("inf"))
+        tex_x = np.zeros(sin_a.shape, dtype=int)
+
+        bounds = self.get_door_ray_bounds(door)
+        if not bounds:
+            return closest_depth, tex_x
+
+        if door.axis == "x":
+            valid = np.abs(cos_a) >= 1e-6
+            faces, origin, other_origin = (bounds["min_x"], bounds["max_x"]), ox, oy
+            along, across = cos_a, sin_a
+            low, high = bounds["min_y"], bounds["max_y"]
+        else:
+            valid = np.abs(sin_a) >= 1e-6
+            faces, origin, other_origin = (bounds["min_y"], bounds["max_y"]), oy, ox
+            along, across = sin_a, cos_a
+            low, high = bounds["min_x"], bounds["max_x"]
+
+        safe_along = np.where(valid, along, 1.0)
+        for face in faces:
+            t = (face - origin) / safe_along
+            hit = other_origin + t * across
+            closer = valid & (t > 0) & (hit >= low) & (hit <= high) & (t < closest_depth)
+
+            closest_depth[closer] = t[closer]
+            rel = (hit[closer] - low) / max(1, high - low)
+            tex_x[closer] = (rel * TILE_SIZE).astype(int) % TILE_SIZE
+
+        return closest_depth, tex_x
+
+    def draw_wall_columns(self, screen, columns, first_ray=0):
+        ray_width = self.ray_width
+        height = screen.get_height()
+        projection = self.wall_projection * self.render_scale
+        mip_distances = self.get_mip_distances(projection)
 
-            sprite = pg.transform.scale(enemy_img, (img_width, img_height))
-            height = screen.get_height()
-            center_y = height // 2
-            floor_offset = img_height * 0.3
-            screen_y = center_y - (img_height // 2) + floor_offset
+        depths = []
+        for ray, (depth, gid, tex_x, render_width) in enumerate(columns, start=first_ray):
+            wall_height = projection / (depth + 0.0001)
+            screen_x = ray * ray_width
+            depths.append(depth)
+
+            # Render, distant walls from the mip level closest to their size on screen
+            level = 0
+            while level < len(mip_distances) and depth >= mip_distances[level]:
+                level += 1
+            texture_column = self.level.texture_cache.get_column(gid, tex_x, level)
+            if texture_column:
+                safe_height = max(1, min(int(wall_height), height * 2))
+                column = pg.transform.scale(texture_column, (render_width, safe_height))
 
-            for x in range(left_x, right_x + 1):
-                if x < 0 or x >= SCREEN_WIDTH:
-                    continue
+                column_y = (height - safe_height) // 2
+                screen.blit(column, (screen_x, column_y))
+
+        # Z-buffer
+        self.z_buffer.set_columns(first_ray * ray_width, depths, ray_width)
+
+    def render_billboards(self, screen, player, objects):
+        """Single sprite pass: project every drawable at once, sort by distance once, draw far to near"""
+        view_height = screen.get_height()
+        # Objects in tiles that cannot be seen from the player's tile, even through open doors, are dropped first
+        objects = self.level.pvs.filter_visible(objects, player.x, player.y)
+        billboards = []
+        for obj, distance, depth, screen_x in project_billboards(objects, player, self.fov, SCREEN_WIDTH):
+            billboard = obj.get_billboard(self, depth, screen_x, view_height)
+            if billboard:
+                billboards.append((distance, billboard))
+
+        billboards.sort(key=lambda item: item[0], reverse=True)
+        for _, billboard in billboards:
+            self.draw_billboard(screen, billboard)
+
+    def draw_billboard(self, screen, billboard):
+        """Scale and draw the columns of a billboard that are in front of the walls"""
+        left, right = billboard.x, billboard.x + billboard.width
+        limit = billboard.depth - billboard.margin
+        if not self.z_buffer.any_nearer(left, right, limit):
+            spans = [(max(0, int(left)), min(SCREEN_WIDTH, int(right)))]  # Nothing in front: one blit
+            if spans[0][0] >= spans[0][1]:
+                return
+        else:
+            spans = self.z_buffer.visible_spans(left, right, limit)
+            if not spans:
+                return
+
+        sprite = sprite_cache.get(billboard.sprite, (billboard.width, billboard.height))
+        if self.render_backend == "buffer" and self.frame_buffer and self.frame_buffer.pending:
+            self.frame_buffer.blit_sprite(sprite, billboard.x, billboard.y, limit, self.z_buffer.depth)
+        else:
+            self.blit_spans(screen, sprite, billboard.x, billboard.y, spans)
 
-                if corrected_dist < self.z_buffer[x]:
-                    if right_x != left_x:
-                        col_ratio = (x - left_x) / (right_x - left_x)
-                        sprite_x = min(img_width - 1, max(0, int(col_ratio * img_width)))
-                    else:
-                        sprite_x = 0
+    def render_enemies(self, screen, player, enemies):
+        self.render_billboards(screen, player, enemies)
 
-                    if sprite_x < img_width:
-                        column = sprite.subsurface(sprite_x, 0, 1, img_height)
-                        screen.blit(column, (x, screen_y))
+    @staticmethod
+    def blit_spans(screen, sprite, x, y, spans):
+        """Blit the visible runs of a sprite drawn at (x, y), one blit per run"""
+        height = sprite.get_height()
+        for start, end in spans:
+            screen.blit(sprite, (start, y), (start - x, 0, end - start, height))
 
     def get_center_ray_angle(self):
         return self.player.angle
 
     def render_pickups(self, screen, player, pickups):
-        ox, oy = player.get_position()
-        player_angle = player.get_angle()
-
-        # Sort pickups by distance (farthest first for proper depth ordering)
-        sorted_pickups = []
-        for pickup in pickups:
-            if pickup.picked_up:
-                continue
-
-            dx = pickup.x - ox
-            dy = pickup.y - oy
-            distance = math.hypot(dx, dy)
-            sorted_pickups.append((pickup, distance))
-
-        sorted_pickups.sort(key=lambda x: x[1], reverse=True)
-
-        for pickup, distance in sorted_pickups:
-            dx = pickup.x - ox
-            dy = pickup.y - oy
-
-            # Calculate angle to pickup relative to player's facing direction
-            pickup_angle = math.atan2(dy, dx)
-            angle_diff = pickup_angle - player_angle
-
-            # Normalize angle difference to [-π, π]
-            while angle_diff > math.pi:
-                angle_diff -= 2 * math.pi
-            while angle_diff < -math.pi:
-                angle_diff += 2 * math.pi
-
-            # Check if pickup is within FOV
-            if abs(angle_diff) > self.fov / 2:
-                continue
-
-            # Calculate screen X position
-            screen_x = int(SCREEN_WIDTH / 2 + (angle_diff / (self.fov / 2)) * (SCREEN_WIDTH / 2))
-
-            # Correct distance for fisheye effect (same as walls)
-            corrected_distance = distance * math.cos(angle_diff)
-
-            # Wolf3D-style scaling: pickups are much smaller than walls
-            # Use a smaller base size for pickups (they're floor items, not wall-height)
-            base_pickup_size = 8000  # Much smaller than wall's 40 000
-            pickup_height = int((base_pickup_size / (corrected_distance + 0.0001)) * WALL_HEIGHT_SCALE * PICKUP_SCALE)
-
-            # Get original sprite dimensions
-            sprite = pickup.sprite
-            original_width, original_height = sprite.get_size()
-
-            # Maintain aspect ratio properly
-            aspect_ratio = original_width / original_height
-            pickup_width = int(pickup_height * aspect_ratio)
-
-            # Clamp height but recalculate width to maintain aspect ratio
-            max_pickup_height = SCREEN_HEIGHT // 6
-            if pickup_height > max_pickup_height:
-                pickup_height = max_pickup_height
-                pickup_width = int(pickup_height * aspect_ratio)
-
-            # Ensure minimum size
-            pickup_height = max(12, pickup_height)
-            pickup_width = max(int(12 * aspect_ratio), pickup_width)
-
-            # Calculate drawing bounds
-            left_x = screen_x - pickup_width // 2
-            right_x = left_x + pickup_width
-
-            # Skip if completely off-screen
-            if right_x < 0 or left_x >= SCREEN_WIDTH:
-                continue
-
-            # Check z-buffer visibility
-            visible = False
-            for x in range(max(0, left_x), min(SCREEN_WIDTH, right_x)):
-                if corrected_distance < self.z_buffer[x]:
-                    visible = True
-                    break
-
-            if not visible:
-                continue
-
-            # Scale the sprite maintaining aspect ratio
-            scaled_sprite = pg.transform.scale(sprite, (pickup_width, pickup_height))
-
-            # Position pickup on the ground (Wolf3D style)
-            # Ground level should be at the horizon line (screen center)
-            surface_height = screen.get_height()
-            horizon_y = surface_height // 2
-            pickup_y = horizon_y + pickup_height + 35
-
-            # Render pickup column by column with z-buffer checking
-            for x in range(max(0, left_x), min(SCREEN_WIDTH, right_x)):
-                if corrected_distance < self.z_buffer[x]:
-                    # Calculate which column of the sprite to draw
-                    local_x = x - left_x
-                    if pickup_width > 0 and local_x < pickup_width:
-                        # Extract single pixel column from scaled sprite
-                        try:
-                            column = scaled_sprite.subsurface(local_x, 0, 1, pickup_height)
-                            screen.blit(column, (x, pickup_y))
-                        except ValueError:
-                            # Skip if subsurface is invalid
-                            continue
\ No newline at end of file
+        self.render_billboards(screen, player, pickups)
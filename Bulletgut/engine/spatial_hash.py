@@ -0,0 +1,137 @@
+from data.config import TILE_SIZE
+
+
+class SpatialHash:
+    """Uniform grid of tile-sized buckets, to find the entities around a point, a rectangle or a line
+
+    An entity is registered with insert() at its x, y and a radius covering its largest hit extent,
+    in every bucket that circle's bounding box overlaps; move() re-buckets it after its x, y changed.
+    Queries only read the buckets they cover and return the entities whose circle touches the shape,
+    callers keep their own exact hit test on that short list.
+    """
+
+    def __init__(self, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell x, cell y) -> {entity: None}, in insertion order
+        self.entries = {}  # entity -> (radius, (first cell x, first cell y, last cell x, last cell y))
+
+    def __contains__(self, entity):
+        return entity in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_span(self, x, y, radius):
+        size = self.cell_size
+        return (int((x - radius) // size), int((y - radius) // size),
+                int((x + radius) // size), int((y + radius) // size))
+
+    def insert(self, entity, radius=0):
+        span = self.get_span(entity.x, entity.y, radius)
+        entry = self.entries.get(entity)
+        if entry is not None:
+            if entry == (radius, span):
+                return
+            self._unlink(entity, entry[1])
+        self.entries[entity] = (radius, span)
+        x0, y0, x1, y1 = span
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self.cells.setdefault((cx, cy), {})[entity] = None
+
+    def move(self, entity):
+        """Re-bucket a registered entity after it moved (nothing to do while it stays in the same buckets)"""
+        entry = self.entries.get(entity)
+        if entry is not None:
+            self.insert(entity, entry[0])
+
+    def remove(self, entity):
+        entry = self.entries.pop(entity, None)
+        if entry is not None:
+            self._unlink(entity, entry[1])
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+
+    def _unlink(self, entity, span):
+        x0, y0, x1, y1 = span
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.pop(entity, None)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
+
+    def _collect(self, x0, y0, x1, y1, found):
+        """Entities of the buckets from (x0, y0) to (x1, y1), in cells, added to the found dict"""
+        cells = self.cells
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def query_radius(self, x, y, radius):
+        """Entities whose circle touches the circle of radius around (x, y)"""
+        found = self._collect(*self.get_span(x, y, radius), {})
+        entries = self.entries
+        result = []
+        for entity in found:
+            reach = radius + entries[entity][0]
+            dx, dy = entity.x - x, entity.y - y
+            if dx * dx + dy * dy <= reach * reach:
+                result.append(entity)
+        return result
+
+    def query_rect(self, rect):
+        """Entities whose circle's bounding box overlaps a pygame Rect"""
+        size = self.cell_size
+        found = self._collect(rect.left // size, rect.top // size, (rect.right - 1) // size,
+                              (rect.bottom - 1) // size, {})
+        entries = self.entries
+        result = []
+        for entity in found:
+            r = entries[entity][0]
+            if (entity.x + r >= rect.left and entity.x - r < rect.right
+                    and entity.y + r >= rect.top and entity.y - r < rect.bottom):
+                result.append(entity)
+        return result
+
+    def query_segment(self, x0, y0, x1, y1, radius=0):
+        """Entities whose circle comes within radius of the segment, sorted from (x0, y0) to (x1, y1)
+
+        Only the buckets along the segment are read: for each row of cells, the part of the
+        segment crossing that row (widened by radius) gives the columns to look at.
+        """
+        size = self.cell_size
+        dx, dy = x1 - x0, y1 - y0
+        found = {}
+        first_row = int((min(y0, y1) - radius) // size)
+        last_row = int((max(y0, y1) + radius) // size)
+        for cy in range(first_row, last_row + 1):
+            if dy == 0:
+                xa, xb = x0, x1
+            else:
+                ta = (cy * size - radius - y0) / dy
+                tb = ((cy + 1) * size + radius - y0) / dy
+                t0, t1 = max(0.0, min(ta, tb)), min(1.0, max(ta, tb))
+                if t0 > t1:
+                    continue
+                xa, xb = x0 + dx * t0, x0 + dx * t1
+            self._collect(int((min(xa, xb) - radius) // size), cy, int((max(xa, xb) + radius) // size), cy, found)
+
+        length_sq = dx * dx + dy * dy
+        entries = self.entries
+        hits = []
+        for entity in found:
+            ex, ey = entity.x - x0, entity.y - y0
+            t = 0.0 if length_sq == 0 else max(0.0, min(1.0, (ex * dx + ey * dy) / length_sq))
+            cx, cy = ex - dx * t, ey - dy * t
+            reach = radius + entries[entity][0]
+            if cx * cx + cy * cy <= reach * reach:
+                hits.append((t, entity))
+        hits.sort(key=lambda hit: hit[0])
+        return [entity for _, entity in hits]
@@ -0,0 +1,69 @@
+from collections import OrderedDict
+import pygame as pg
+from data.config import SPRITE_SIZE_QUANTUM, SPRITE_CACHE_MAX_BYTES
+from utils.assets import get_mip_level
+
+
+class ScaledSpriteCache:
+    """Scaled billboard sprites keyed by (source frame, size bucket), evicted least recently used first"""
+
+    def __init__(self, max_bytes=SPRITE_CACHE_MAX_BYTES, quantum=SPRITE_SIZE_QUANTUM):
+        self.max_bytes = max_bytes
+        self.quantum = max(1, int(quantum))
+        # (source, width, height) -> scaled Surface. The key holds the source surface itself,
+        # so a freed frame can never hand its cache entries to a new surface.
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bucket(self, size):
+        """Round a length to the size quantum (never below one quantum)"""
+        return max(self.quantum, int(size + self.quantum // 2) // self.quantum * self.quantum)
+
+    def get(self, source, size):
+        """Return source scaled to size, rounded to the size quantum"""
+        width, height = size
+        if self.quantum > 1:
+            width, height = self.bucket(width), self.bucket(height)
+        width, height = max(1, int(width)), max(1, int(height))
+        key = (source, width, height)
+
+        scaled = self.entries.get(key)
+        if scaled is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return scaled
+
+        self.misses += 1
+        # Shrunk from the nearest mip level rather than from the full size frame
+        scaled = pg.transform.scale(get_mip_level(source, width, height), (width, height))
+        entry_bytes = width * height * scaled.get_bytesize()
+        if entry_bytes > self.max_bytes:
+            return scaled  # Too big to be worth keeping (a sprite right in the player's face)
+
+        self.entries[key] = scaled
+        self.bytes += entry_bytes
+        while self.bytes > self.max_bytes:
+            (_, old_width, old_height), old = self.entries.popitem(last=False)
+            self.bytes -= old_width * old_height * old.get_bytesize()
+            self.evictions += 1
+        return scaled
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def get_hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        print(f"[SPRITES] {len(self.entries)} scaled sprites, {self.bytes / 1024:.1f} KB "
+              f"of {self.max_bytes / 1024:.0f} KB, hit rate {self.get_hit_rate() * 100:.1f}% "
+              f"({self.hits} hits / {self.misses} misses / {self.evictions} evictions)")
+
+
+# Shared by every billboard: enemies, pickups, projectiles and explosions
+sprite_cache = ScaledSpriteCache()
@@ -0,0 +1,128 @@
+import pygame as pg
+from data.config import TILE_SIZE, MIPMAPS, MIP_MIN_SIZE
+from utils.assets import make_mip_chain
+
+try:
+    import numpy as np
+except ImportError:  # Only the frame buffer backend needs the texture arrays
+    np = None
+
+
+class TextureCache:
+    """Wall and door textures normalized to TILE_SIZE and pre-sliced into columns, keyed by GID"""
+
+    def __init__(self, tmx_data, gids=()):
+        self.tmx_data = tmx_data
+        self.textures = {}  # gid -> Surface normalized to TILE_SIZE (or None if the GID has no image)
+        self.columns = {}  # gid -> list of TILE_SIZE one pixel wide subsurfaces
+        # Mip level L (1..mip_levels-1) of a texture is TILE_SIZE >> L pixels wide
+        self.mip_levels = 1
+        while MIPMAPS and TILE_SIZE >> self.mip_levels >= MIP_MIN_SIZE:
+            self.mip_levels += 1
+        self.mip_columns = {}  # gid -> [level 1 columns, level 2 columns, ...]
+        self.hits = 0
+        self.misses = 0
+        self._arrays = None  # (pixels, opaque, slot_by_gid) for the frame buffer backend, every mip level
+
+        for gid in gids:
+            self.add(gid)
+
+    def add(self, gid):
+        """Normalize one tile to TILE_SIZE and split it into columns"""
+        tile_img = self.tmx_data.get_tile_image_by_gid(gid) if gid else None
+        self._arrays = None
+        if not tile_img:
+            self.textures[gid] = None
+            self.columns[gid] = None
+            self.mip_columns[gid] = None
+            return
+
+        texture = pg.transform.scale(tile_img, (TILE_SIZE, TILE_SIZE))
+        if self.mip_levels > 1 and texture.get_bitsize() not in (24, 32):
+            texture = texture.convert_alpha()  # smoothscale (mip levels) needs 24 or 32 bit pixels
+        self.textures[gid] = texture
+        # Subsurfaces share the pixels of the texture, slicing costs no extra pixel memory
+        self.columns[gid] = [texture.subsurface(x, 0, 1, TILE_SIZE) for x in range(TILE_SIZE)]
+        self.mip_columns[gid] = [[level.subsurface(x, 0, 1, level.get_height()) for x in range(level.get_width())]
+                                 for level in make_mip_chain(texture, MIP_MIN_SIZE)[:self.mip_levels - 1]]
+
+    def get_column(self, gid, tex_x, level=0):
+        """Return the column surface of a GID at a mip level, or None if the GID has no image
+
+        tex_x is always in level 0 texels (0 to TILE_SIZE - 1).
+        """
+        if level:
+            mip_columns = self.mip_columns.get(gid)
+            if mip_columns:
+                self.hits += 1
+                columns = mip_columns[min(level, len(mip_columns)) - 1]
+                return columns[max(0, min(tex_x, TILE_SIZE - 1)) * len(columns) // TILE_SIZE]
+
+        columns = self.columns.get(gid)
+        if columns is None:
+            if gid in self.columns:
+                self.hits += 1
+                return None
+            # GID that was not in the level layers at load time
+            self.misses += 1
+            self.add(gid)
+            columns = self.columns[gid]
+            if columns is None:
+                return None
+        else:
+            self.hits += 1
+
+        return columns[max(0, min(tex_x, TILE_SIZE - 1))]
+
+    def get_texture_arrays(self):
+        """Every texture stacked into NumPy arrays: pixels[slot, x, y], opaque[slot, x, y], slot_by_gid[gid]
+
+        Slot 0 is an empty texture, used for GIDs without image. Mip level L of a texture is stored
+        at slot + L * slots_per_level, blown back up to TILE_SIZE so every slot is sampled the same way.
+        """
+        if self._arrays is None:
+            gids = [gid for gid, texture in self.textures.items() if texture]
+            slots = len(gids) + 1
+            pixels = np.zeros((slots * self.mip_levels, TILE_SIZE, TILE_SIZE, 3), dtype=np.uint8)
+            opaque = np.zeros((slots * self.mip_levels, TILE_SIZE, TILE_SIZE), dtype=bool)
+            slot_by_gid = np.zeros(max(gids, default=0) + 1, dtype=int)
+
+            for slot, gid in enumerate(gids, start=1):
+                texture = self.textures[gid]
+                alpha = texture.get_flags() & pg.SRCALPHA
+                pixels[slot] = pg.surfarray.array3d(texture)
+                opaque[slot] = pg.surfarray.array_alpha(texture) > 0 if alpha else True
+                for level, columns in enumerate(self.mip_columns[gid], start=1):
+                    image = columns[0].get_parent()
+                    factor = TILE_SIZE // image.get_width()
+                    level_slot = slot + level * slots
+                    pixels[level_slot] = pg.surfarray.array3d(image).repeat(factor, 0).repeat(factor, 1)
+                    if alpha:
+                        opaque[level_slot] = (pg.surfarray.array_alpha(image) > 127).repeat(factor, 0).repeat(factor, 1)
+                    else:
+                        opaque[level_slot] = True
+                slot_by_gid[gid] = slot
+
+            self._arrays = (pixels, opaque, slot_by_gid)
+
+        return self._arrays
+
+    def get_memory_usage(self):
+        """Pixel memory held by the cached textures, in bytes"""
+        return sum(texture.get_bytesize() * TILE_SIZE * TILE_SIZE
+                   for texture in self.textures.values() if texture)
+
+    def get_mip_memory_usage(self):
+        """Pixel memory held by the mip levels of the cached textures, in bytes"""
+        return sum(columns[0].get_parent().get_bytesize() * len(columns) * len(columns)
+                   for levels in self.mip_columns.values() if levels for columns in levels)
+
+    def get_hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self):
+        textures = sum(1 for texture in self.textures.values() if texture)
+        print(f"[TEXTURES] {textures} textures, {textures * TILE_SIZE} columns, "
+              f"{self.get_memory_usage() / 1024:.1f} KB + {self.get_mip_memory_usage() / 1024:.1f} KB of mip levels, "
+              f"hit rate {self.get_hit_rate() * 100:.1f}% ({self.hits} hits / {self.misses} misses)")
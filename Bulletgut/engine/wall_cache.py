@@ -0,0 +1,46 @@
+class WallCache:
+    """Wall layer (floor, ceiling and walls) and z-buffer of the last frame, reused while the view is static
+
+    The view key holds everything the wall layer depends on except the doors (player position and angle,
+    resolution, backend, floor color); door progress values are compared one by one so that a moving
+    door only invalidates the columns it covers.
+    """
+
+    def __init__(self):
+        self.view_key = None
+        self.door_progress = None
+        self.z_buffer = None
+        self.layer = None  # Surface copy (surface backend) or pixel array copy (buffer backend)
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+
+    def get_moved_doors(self, view_key, door_progress):
+        """Indexes of the doors that moved since the cached frame, or None when the whole view changed"""
+        if self.layer is None or view_key != self.view_key or len(door_progress) != len(self.door_progress):
+            self.misses += 1
+            return None
+
+        moved = [index for index, (progress, cached) in enumerate(zip(door_progress, self.door_progress))
+                 if progress != cached]
+        if moved:
+            self.partial_hits += 1
+        else:
+            self.hits += 1
+        return moved
+
+    def store(self, view_key, door_progress, z_buffer, layer):
+        self.view_key = view_key
+        self.door_progress = door_progress
+        self.z_buffer = z_buffer  # Copy of the z-buffer depths
+        self.layer = layer
+
+    def invalidate(self):
+        self.view_key = None
+        self.layer = None
+
+    def report(self):
+        frames = self.hits + self.partial_hits + self.misses
+        if frames:
+            print(f"[WALLS] {frames} frames: {self.hits} reused, {self.partial_hits} door columns only, "
+                  f"{self.misses} fully cast")
@@ -0,0 +1,71 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the depths are then kept in a plain list
+    np = None
+
+
+class ZBuffer:
+    """Wall depth of every screen column, written by the wall pass and queried by billboards"""
+
+    def __init__(self, width):
+        self.width = width
+        if np is not None:
+            self.depth = np.full(width, np.inf, dtype=np.float32)
+        else:
+            self.depth = [float('inf')] * width
+
+    def clear(self):
+        if np is not None:
+            self.depth.fill(np.inf)
+        else:
+            self.depth[:] = [float('inf')] * self.width
+
+    def set_columns(self, left, depths, column_width=1):
+        """Write one depth per ray, each covering column_width screen columns from left"""
+        if np is not None:
+            values = np.repeat(np.asarray(depths, dtype=np.float32), column_width)[:max(0, self.width - left)]
+        else:
+            values = [depth for depth in depths for _ in range(column_width)][:max(0, self.width - left)]
+        self.depth[left:left + len(values)] = values
+
+    def copy(self):
+        """Copy of the depths, for set_state"""
+        return self.depth.copy()
+
+    def set_state(self, depths):
+        self.depth[:] = depths
+
+    def any_nearer(self, left, right, depth):
+        """Is any column in [left, right) nearer than (or level with) depth"""
+        left, right = max(0, int(left)), min(self.width, int(right))
+        if left >= right:
+            return False
+        if np is not None:
+            return bool((self.depth[left:right] <= depth).any())
+        return any(z <= depth for z in self.depth[left:right])
+
+    def visible_spans(self, left, right, depth):
+        """Runs [start, end) of columns in [left, right) where depth is in front of the walls"""
+        left, right = max(0, int(left)), min(self.width, int(right))
+        if left >= right:
+            return []
+
+        if np is not None:
+            visible = np.empty(right - left + 2, dtype=np.int8)
+            visible[0] = visible[-1] = 0
+            visible[1:-1] = depth < self.depth[left:right]
+            edges = np.flatnonzero(np.diff(visible)) + left
+            return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+        spans = []
+        start = None
+        for x in range(left, right):
+            if depth < self.depth[x]:
+                if start is None:
+                    start = x
+            elif start is not None:
+                spans.append((start, x))
+                start = None
+        if start is not None:
+            spans.append((start, right))
+        return spans
@@ -12,6 +12,7 @@ class Door:
         self.speed = 2.0  # Speed multiplier for opening/closing
 
         self.required_key = None
+        self.level = None  # Set by Level.load_doors, notified when the door starts/stops blocking
 
         # Door properties matching DUGA's system
         self.thickness = thickness
@@ -27,6 +28,7 @@ class Door:
 
     def update(self, dt):
         old_progress = self.progress
+        was_blocking = self.is_blocking()
 
         if self.state == "opening":
             self.progress += dt * self.speed
@@ -51,6 +53,9 @@ class Door:
             self.open = int(self.progress * self.max_open)
             self.update_bounds()
 
+            if self.level and self.is_blocking() != was_blocking:
+                self.level.on_door_state_changed(self)
+
     def update_bounds(self):
         """Update collision bounds based on door opening progress (DUGA style)"""
         base_x = self.grid_x * TILE_SIZE
@@ -2,6 +2,10 @@ import pygame
 import math
 import random
 from utils.assets import load_animation_set, load_sound
+from data.config import SCREEN_WIDTH, WALL_HEIGHT_SCALE, FPS
+from engine.billboard import Billboard
+
+DEATH_FRAME_TICKS = 15  # Drawn frames each death frame stays on screen
 
 class EnemyBase:
     def __init__(self, x, y, level, asset_folder):
@@ -79,12 +83,11 @@ class EnemyBase:
             return
 
         self.target = player
-        dx = player.x - self.x
-        dy = player.y - self.y
-        dist = math.hypot(dx, dy)
+        # Distance to the player from this frame's perception pass (engine/perception.py)
+        dist = self.level.perception.distance[self.perception_index]
 
         # Réveil si joueur est proche
-        if dist < self.wake_up_distance:
+        if self.level.perception.wake[self.perception_index]:
             self.is_awake = True
 
         if not self.is_awake:
@@ -93,17 +96,17 @@ class EnemyBase:
             return
 
         if dist < 300:
-            self.facing_direction_override = self.get_facing_direction(player.x, player.y)
+            self.facing_direction_override = self.get_player_facing()
             self.move_towards_player(player, dt)
             self.state = "move"
 
             if dist < 100 and self.attack_cooldown <= 0:
-                self.facing_direction_override = self.get_facing_direction(player.x, player.y)
+                self.facing_direction_override = self.get_player_facing()
                 self.attack()
 
             elif self.can_see_target():
                 # Toujours se tourner vers le joueur si on le voit
-                self.facing_direction_override = self.get_facing_direction(player.x, player.y)
+                self.facing_direction_override = self.get_player_facing()
 
         else:
             if not self.can_see_target():
@@ -127,6 +130,17 @@ class EnemyBase:
         self.update_animation(dt)
         self.melee_hitbox.center = self.rect.center
 
+    def get_chase_direction(self, dx, dy, dist):
+        """Unit direction of the next step towards the player (dx, dy away, dist > 0)
+
+        Follows the level's flow field around walls and closed doors, straight at the player
+        when they are close or out of the field's reach.
+        """
+        step = self.level.flow_field.get_direction(self.x, self.y)
+        if step is None:
+            return dx / dist, dy / dist
+        return step
+
     def move_towards_player(self, player, dt):
         """Move towards the player"""
         dx = player.x - self.x
@@ -136,9 +150,8 @@ class EnemyBase:
         if dist == 0:
             return
 
-        # Normalize direction
-        dx /= dist
-        dy /= dist
+        # Normalize direction, along the flow field
+        dx, dy = self.get_chase_direction(dx, dy, dist)
 
         # Move with collision checking
         move_x = dx * self.speed * dt * 60
@@ -209,6 +222,8 @@ class EnemyBase:
         self.position = (self.x, self.y)
         self.rect.center = (self.x, self.y)
         if self.x != old_x or self.y != old_y:
+            self.level.enemy_hash.move(self)
+            self.level.perception.move(self)
             self.state = "move"
 
     def patrol(self, dt):
@@ -298,6 +313,7 @@ class EnemyBase:
         # IMPORTANT: Reset animation properly for death
         self.frame_index = 0
         self.frame_timer = 0
+        self.death_timer = 0
 
         # Set facing direction for death animation (usually front-facing)
         self.facing_direction_override = 0  # Face front when dying
@@ -312,6 +328,17 @@ class EnemyBase:
         """Override in subclasses"""
         pass
 
+    def is_death_animation_finished(self):
+        """Dead for as long as the death animation lasts at FPS
+
+        Timed with death_timer, which update() advances, rather than frame_index, which only
+        moves while the enemy is drawn: an enemy killed out of view still finishes dying.
+        """
+        if self.alive or self.state != "death":
+            return False
+        frames = self.animations.get("death", {}).get(-1)
+        return not frames or self.death_timer >= len(frames) * DEATH_FRAME_TICKS / FPS
+
     def update_animation(self, dt):
         if self.state == "death":
             if not hasattr(self, 'death_timer'):
@@ -324,6 +351,12 @@ class EnemyBase:
             angle = (math.degrees(math.atan2(-dy, dx)) + 360) % 360
             return int((angle + 22.5) // 45) % 8  # Découpe en 8 directions (0=Front, etc.)
 
+    def get_player_facing(self):
+        """get_facing_direction() for the player, from this frame's perception pass"""
+        if self.is_alerted:
+            return 0  # Toujours montrer la face (front)
+        return self.level.perception.facing[self.perception_index]
+
     def get_facing_direction(self, viewer_x, viewer_y):
         """Retourne la direction du sprite à afficher selon l'état d'éveil de l'ennemi."""
         if self.is_alerted:
@@ -422,6 +455,32 @@ class EnemyBase:
     #     return (entity_screen_x - sprite_width // 2,
     #             entity_screen_y - sprite_height // 2)
 
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
+        """Sprite size and position in the 3D view, standing on the floor"""
+        enemy_img = self.get_sprite(raycaster.player.x, raycaster.player.y)
+        if not enemy_img:
+            return None
+
+        size_reduction_factor = 0.55
+        wall_height = (40000 / (depth + 0.0001)) * WALL_HEIGHT_SCALE
+        wall_height *= size_reduction_factor
+
+        original_width, original_height = enemy_img.get_size()
+        aspect_ratio = original_width / original_height
+
+        img_height = int(wall_height)
+        img_width = int(img_height * aspect_ratio)
+
+        max_size = SCREEN_WIDTH // 3
+        if img_width > max_size or img_height > max_size:
+            scale_factor = max_size / max(img_width, img_height)
+            img_width = int(img_width * scale_factor)
+            img_height = int(img_height * scale_factor)
+
+        floor_offset = img_height * 0.3
+        screen_y = view_height // 2 - (img_height // 2) + floor_offset
+        return Billboard(enemy_img, screen_x - img_width // 2, screen_y, img_width, img_height, depth)
+
     def get_sprite(self, viewer_x, viewer_y):
         if not self.alive and self.state != "death":
             return None
@@ -458,10 +517,9 @@ class EnemyBase:
                 self.frame_index = len(frames) - 1  # Stay on last frame
 
             # FIXED: Slower death animation with proper frame advancement
-            frame_advance_speed = 15  # Slower animation
             self.frame_timer += 1
 
-            if self.frame_timer >= frame_advance_speed:
+            if self.frame_timer >= DEATH_FRAME_TICKS:
                 self.frame_timer = 0
                 # Only advance if not on last frame
                 if self.frame_index < len(frames) - 1:
@@ -546,30 +604,8 @@ class EnemyBase:
         return self.has_line_of_sight(self.target)
 
     def has_line_of_sight(self, player):
-        """Raycast to check line of sight"""
-        x0, y0 = int(self.x // 64), int(self.y // 64)
-        x1, y1 = int(player.x // 64), int(player.y // 64)
-
-        dx = abs(x1 - x0)
-        dy = abs(y1 - y0)
-        sx = 1 if x0 < x1 else -1
-        sy = 1 if y0 < y1 else -1
-        err = dx - dy
-
-        while x0 != x1 or y0 != y1:
-            wx = x0 * 64 + 32
-            wy = y0 * 64 + 32
-            if self.level.is_blocked(wx, wy):
-                return False
-            e2 = 2 * err
-            if e2 > -dy:
-                err -= dy
-                x0 += sx
-            if e2 < dx:
-                err += dx
-                y0 += sy
-
-        return True
+        """Tile line of sight to the player, from the level's cache (walked again only when a door on it changed)"""
+        return self.level.line_of_sight.is_clear(self.x, self.y, player.x, player.y)
 
     def update_rect(self):
         self.rect.topleft = (int(self.x) - self.rect.width // 2, int(self.y) - self.rect.height // 2)
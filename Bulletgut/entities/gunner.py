@@ -78,9 +78,8 @@ class Gunner(EnemyBase):
             return
 
         self.target = player
-        dx = player.x - self.x
-        dy = player.y - self.y
-        dist = math.hypot(dx, dy)
+        # Distance to the player from this frame's perception pass (engine/perception.py)
+        dist = self.level.perception.distance[self.perception_index]
 
         # Update cooldowns and attack sequence timing
         if self.attack_cooldown > 0:
@@ -127,7 +126,7 @@ class Gunner(EnemyBase):
         # Normal AI behavior continues...
         if self.is_alerted and can_see_player:
             if not self.is_in_attack_sequence:
-                self.facing_direction_override = self.get_facing_direction(player.x, player.y)
+                self.facing_direction_override = self.get_player_facing()
             if self.attack_cooldown <= 0:
                 additional_delay = random.randint(0, 800)
                 if additional_delay > 600:
@@ -153,7 +152,7 @@ class Gunner(EnemyBase):
             chase_dist = math.hypot(self.last_seen_player_pos.x - self.x,
                                     self.last_seen_player_pos.y - self.y)
             if chase_dist > 32 and self.chase_timer > 0:
-                self.facing_direction_override = self.get_facing_direction(player.x, player.y)
+                self.facing_direction_override = self.get_player_facing()
                 self.move_towards(self.last_seen_player_pos.x, self.last_seen_player_pos.y, dt)
                 self.state = "move"
                 self.chase_timer -= dt
@@ -301,8 +300,7 @@ class Gunner(EnemyBase):
             self.movement_timer = 0
 
         # Calculate base direction to player
-        base_dx = dx / dist
-        base_dy = dy / dist
+        base_dx, base_dy = self.get_chase_direction(dx, dy, dist)
 
         # Choose movement based on current mode
         move_dx, move_dy = self.calculate_movement_direction(base_dx, base_dy, dist, player_moved, dt)
@@ -494,12 +492,8 @@ class Gunner(EnemyBase):
         if not self.target:
             return False
 
-        # Check basic distance first
-        dx = self.target.x - self.x
-        dy = self.target.y - self.y
-        dist = math.hypot(dx, dy)
-
-        if dist > self.vision_range:
+        # Check basic distance first (perception pass)
+        if not self.level.perception.in_range[self.perception_index]:
             return False
 
         # Use proper line of sight raycast - this should block vision through walls
@@ -544,6 +538,7 @@ class Gunner(EnemyBase):
                        sprite_path="assets/pickups/ammo/ammo_clip.png", label="A CLIP")
         loot.dropped_by_enemy = True
         self.level.pickups.append(loot)
+        self.level.pickup_hash.insert(loot)
 
     def take_damage(self, amount, splash=False, direct_hit=True):
         """Override to implement pain/alert behavior"""
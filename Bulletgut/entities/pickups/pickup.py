@@ -1,5 +1,9 @@
 import math
 import pygame as pg
+from data.config import SCREEN_HEIGHT, WALL_HEIGHT_SCALE, PICKUP_SCALE
+from engine.billboard import Billboard
+
+PICKUP_RADIUS = 20  # Distance from the player under which a pickup is collected
 
 class Pickup:
     def __init__(self, x, y, image):
@@ -15,9 +19,37 @@ class Pickup:
         dx = self.x - player.x
         dy = self.y - player.y
         distance = math.hypot(dx, dy)
-        if distance < 20:
+        if distance < PICKUP_RADIUS:
             self.on_pickup(player, game)
 
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
+        """Sprite size and position in the 3D view, lying on the ground (Wolf3D style)"""
+        if self.picked_up:
+            return None
+
+        # Pickups are much smaller than walls: floor items, not wall-height
+        base_pickup_size = 8000  # Much smaller than wall's 40 000
+        pickup_height = int((base_pickup_size / (depth + 0.0001)) * WALL_HEIGHT_SCALE * PICKUP_SCALE)
+
+        # Maintain aspect ratio properly
+        original_width, original_height = self.sprite.get_size()
+        aspect_ratio = original_width / original_height
+        pickup_width = int(pickup_height * aspect_ratio)
+
+        # Clamp height but recalculate width to maintain aspect ratio
+        max_pickup_height = SCREEN_HEIGHT // 6
+        if pickup_height > max_pickup_height:
+            pickup_height = max_pickup_height
+            pickup_width = int(pickup_height * aspect_ratio)
+
+        # Ensure minimum size
+        pickup_height = max(12, pickup_height)
+        pickup_width = max(int(12 * aspect_ratio), pickup_width)
+
+        # Ground level is at the horizon line (screen center)
+        pickup_y = view_height // 2 + pickup_height + 35
+        return Billboard(self.sprite, screen_x - pickup_width // 2, pickup_y, pickup_width, pickup_height, depth)
+
     def _is_near_player(self, player):
         dx = self.x - player.x
         dy = self.y - player.y
@@ -287,7 +287,7 @@ class Player:
                 game.reset_player_state()
 
     def check_enemy_collisions(self, game):
-        for enemy in game.enemies:
+        for enemy in game.level.enemy_hash.query_rect(self.rect):
             if not enemy.alive:
                 continue
             if self.rect.colliderect(enemy.rect):
@@ -83,9 +83,8 @@ class PlutonWorm(EnemyBase):
             return
 
         self.target = player
-        dx = player.x - self.x
-        dy = player.y - self.y
-        dist = math.hypot(dx, dy)
+        # Distance to the player from this frame's perception pass (engine/perception.py)
+        dist = self.level.perception.distance[self.perception_index]
 
         # Update cooldowns and timers
         if self.attack_cooldown > 0:
@@ -150,7 +149,7 @@ class PlutonWorm(EnemyBase):
         if self.is_alerted and can_see_player:
             # Always face the player when alerted and can see them
             if not self.is_in_attack_sequence:
-                self.facing_direction_override = self.get_facing_direction(player.x, player.y)
+                self.facing_direction_override = self.get_player_facing()
 
             # Check for charge opportunity (medium range)
             if (not self.charge_mode and self.charge_cooldown <= 0 and
@@ -232,9 +231,8 @@ class PlutonWorm(EnemyBase):
         if dist == 0:
             return
 
-        # Normalize and move
-        dx /= dist
-        dy /= dist
+        # Normalize (along the flow field) and move
+        dx, dy = self.get_chase_direction(dx, dy, dist)
 
         move_speed = self.speed * dt * 60
         move_x = dx * move_speed
@@ -265,8 +263,7 @@ class PlutonWorm(EnemyBase):
             self.movement_timer = 0
 
         # Calculate base direction
-        base_dx = dx / dist
-        base_dy = dy / dist
+        base_dx, base_dy = self.get_chase_direction(dx, dy, dist)
 
         # More direct approach with some pack behavior
         move_dx, move_dy = self.calculate_aggressive_movement(base_dx, base_dy)
@@ -455,11 +452,8 @@ class PlutonWorm(EnemyBase):
         if not self.target:
             return False
 
-        dx = self.target.x - self.x
-        dy = self.target.y - self.y
-        dist = math.hypot(dx, dy)
-
-        if dist > self.vision_range:
+        # Check basic distance first (perception pass)
+        if not self.level.perception.in_range[self.perception_index]:
             return False
 
         return self.has_line_of_sight(self.target)
@@ -85,9 +85,8 @@ class Serpentipede(EnemyBase):
             return
 
         self.target = player
-        dx = player.x - self.x
-        dy = player.y - self.y
-        dist = math.hypot(dx, dy)
+        # Distance to the player from this frame's perception pass (engine/perception.py)
+        dist = self.level.perception.distance[self.perception_index]
 
         # Update cooldowns and timers
         if self.attack_cooldown > 0:
@@ -133,7 +132,7 @@ class Serpentipede(EnemyBase):
         if self.is_alerted and can_see_player:
             # Always face the player when we can see them
             if not self.is_in_attack_sequence:
-                self.facing_direction_override = self.get_facing_direction(player.x, player.y)
+                self.facing_direction_override = self.get_player_facing()
 
             current_time = pg.time.get_ticks()
 
@@ -241,9 +240,7 @@ class Serpentipede(EnemyBase):
 
     def fire_projectile(self):
         self.sfx_attack_ranged.play()
-        player = self.level.game.player
-        dx, dy = player.x - self.x, player.y - self.y
-        angle = math.atan2(dy, dx)
+        angle = self.level.perception.bearing[self.perception_index]
 
         # Décalage pour éviter que le projectile naisse dans l'ennemi
         offset = 0.5
@@ -310,8 +307,7 @@ class Serpentipede(EnemyBase):
             self.movement_timer = 0
 
         # Calculate movement direction
-        base_dx = dx / dist
-        base_dy = dy / dist
+        base_dx, base_dy = self.get_chase_direction(dx, dy, dist)
         move_dx, move_dy = self.calculate_movement_vector(base_dx, base_dy, dist, player_moved, dt)
 
         # Apply movement with speed scaling
@@ -1,9 +1,12 @@
 import os
 import pygame
 import re
+from data.config import MIPMAPS, MIP_MIN_SIZE
+from utils.atlas import load_atlas
 
 _image_cache = {}
 _sound_cache = {}
+_mip_chains = {}  # Source surface -> [half size, quarter size, ...]
 
 state_aliases = {
     "movement": "move",
@@ -67,6 +70,43 @@ def load_images(folder_path):
     return images
 
 
+def make_mip_chain(image, min_size=MIP_MIN_SIZE):
+    """Chaîne de mipmaps : copies successives à demi-taille, jusqu'à min_size pixels"""
+    chain = []
+    level = image
+    # smoothscale ne gère que les surfaces 24 et 32 bits
+    while image.get_bitsize() in (24, 32) and min(level.get_size()) // 2 >= min_size:
+        width, height = level.get_size()
+        level = pygame.transform.smoothscale(level, (width // 2, height // 2))
+        chain.append(level)
+    return chain
+
+
+def build_mip_chain(image, min_size=MIP_MIN_SIZE):
+    """Chaîne de mipmaps d'un sprite, construite une seule fois par surface (vide si MIPMAPS est désactivé)"""
+    chain = _mip_chains.get(image)
+    if chain is None:
+        chain = _mip_chains[image] = make_mip_chain(image, min_size) if MIPMAPS else []
+    return chain
+
+
+def get_mip_level(image, width, height):
+    """Plus petit niveau de la chaîne encore au moins width x height, l'image elle-même sans chaîne"""
+    for level in reversed(_mip_chains.get(image, ())):
+        if level.get_width() >= width and level.get_height() >= height:
+            return level
+    return image
+
+
+def get_mip_memory():
+    """(octets des sources, octets des chaînes) de toutes les images qui ont une chaîne"""
+    source_bytes = chain_bytes = 0
+    for image, chain in _mip_chains.items():
+        source_bytes += image.get_width() * image.get_height() * image.get_bytesize()
+        chain_bytes += sum(level.get_width() * level.get_height() * level.get_bytesize() for level in chain)
+    return source_bytes, chain_bytes
+
+
 def load_animation_set(folder):
     from collections import defaultdict
     animations = defaultdict(lambda: defaultdict(list))
@@ -82,63 +122,47 @@ def load_animation_set(folder):
         "FrontLeft": 7
     }
 
-    for root, _, files in os.walk(folder):
-        for filename in sorted(files):
-            if not filename.endswith(".png"):
-                continue
-
-            full_path = os.path.join(root, filename)
-            print(f"[DEBUG] Analyse de {full_path}")
-
-            # FIXED: Load image without any modifications
-            image = load_image(full_path)
-
-            # CRITICAL FIX: Ensure the image is properly converted and not scaled
-            # Make sure we're working with the original sprite dimensions
-            if image:
-                # Convert to display format but preserve original size
-                original_size = image.get_size()
-                image = image.convert_alpha()
-                # Verify size wasn't changed during conversion
-                if image.get_size() != original_size:
-                    print(f"[WARNING] Image size changed during conversion: {filename}")
-                    print(f"  Original: {original_size}, New: {image.get_size()}")
-
-            # 1. Death_RegularX.png, Death_BerserkX.png
-            match_death = re.match(r"Death_(Regular|Berserk)(\d+)\.png", filename, re.IGNORECASE)
-            if match_death:
-                subtype, frame = match_death.groups()
-                if subtype.lower() == "regular":
-                    # FIXED: Store death frames with frame number for proper ordering
-                    frame_num = int(frame)
-                    # Ensure we have enough slots in the list
-                    while len(animations["death"][-1]) <= frame_num:
-                        animations["death"][-1].append(None)
-                    animations["death"][-1][frame_num] = image
-                    print(f"[DEATH FRAME] Added frame {frame_num} for death animation")
-                continue
-
-            # 2. Move_Front1.png etc.
-            match_move = re.match(r"(\w+)_([A-Za-z]+)(\d+)\.png", filename)
-            if match_move:
-                state, direction_str, frame_num = match_move.groups()
-                direction = direction_map.get(direction_str)
-                if direction is not None:
-                    frame_idx = int(frame_num) - 1  # Convert to 0-based index
-                    # Ensure we have enough slots
-                    while len(animations[state.lower()][direction]) <= frame_idx:
-                        animations[state.lower()][direction].append(None)
-                    animations[state.lower()][direction][frame_idx] = image
-                continue
-
-            # 3. Idle_Front.png etc.
-            match_static = re.match(r"(\w+)_([A-Za-z]+)\.png", filename)
-            if match_static:
-                state, direction_str = match_static.groups()
-                direction = direction_map.get(direction_str)
-                if direction is not None:
-                    animations[state.lower()][direction].append(image)
-                continue
+    # Frames découpées dans l'atlas du type d'ennemi (quelques pages au lieu de centaines de PNG)
+    atlas = load_atlas(folder)
+    for path, image in atlas.frames.items():
+        filename = os.path.basename(path)
+        build_mip_chain(image)
+
+        # 1. Death_RegularX.png, Death_BerserkX.png
+        match_death = re.match(r"Death_(Regular|Berserk)(\d+)\.png", filename, re.IGNORECASE)
+        if match_death:
+            subtype, frame = match_death.groups()
+            if subtype.lower() == "regular":
+                # FIXED: Store death frames with frame number for proper ordering
+                frame_num = int(frame)
+                # Ensure we have enough slots in the list
+                while len(animations["death"][-1]) <= frame_num:
+                    animations["death"][-1].append(None)
+                animations["death"][-1][frame_num] = image
+                print(f"[DEATH FRAME] Added frame {frame_num} for death animation")
+            continue
+
+        # 2. Move_Front1.png etc.
+        match_move = re.match(r"(\w+)_([A-Za-z]+)(\d+)\.png", filename)
+        if match_move:
+            state, direction_str, frame_num = match_move.groups()
+            direction = direction_map.get(direction_str)
+            if direction is not None:
+                frame_idx = int(frame_num) - 1  # Convert to 0-based index
+                # Ensure we have enough slots
+                while len(animations[state.lower()][direction]) <= frame_idx:
+                    animations[state.lower()][direction].append(None)
+                animations[state.lower()][direction][frame_idx] = image
+            continue
+
+        # 3. Idle_Front.png etc.
+        match_static = re.match(r"(\w+)_([A-Za-z]+)\.png", filename)
+        if match_static:
+            state, direction_str = match_static.groups()
+            direction = direction_map.get(direction_str)
+            if direction is not None:
+                animations[state.lower()][direction].append(image)
+            continue
 
     # CRITICAL FIX: Clean up death animation list by removing None entries
     if "death" in animations and -1 in animations["death"]:
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import pygame
+from data.config import ATLAS_PAGE_SIZE, ATLAS_CACHE_DIR
+
+_atlases = {}  # Dossier -> SpriteAtlas, un seul atlas par type d'ennemi
+
+
+class SpriteAtlas:
+    """Frames d'un dossier de sprites rangées dans quelques grandes surfaces (pages)
+
+    rects : clé de la frame (chemin relatif du PNG) -> (page, Rect). Les frames sont des
+    subsurfaces des pages : elles partagent leurs pixels et se dessinent comme des sous-rectangles.
+    """
+
+    def __init__(self, pages, rects):
+        self.pages = pages
+        self.rects = rects
+        self.frames = {key: pages[page].subsurface(rect) for key, (page, rect) in rects.items()}
+
+    @classmethod
+    def build(cls, images, page_size=ATLAS_PAGE_SIZE, padding=1):
+        """Rangement en étagères : les frames les plus hautes d'abord, de gauche à droite, une étagère par ligne"""
+        order = sorted(images, key=lambda key: (-images[key].get_height(), -images[key].get_width()))
+        # Pages à peu près carrées plutôt que des bandes de page_size de large, moins de pixels vides
+        area = sum((image.get_width() + padding) * (image.get_height() + padding) for image in images.values())
+        widest = max((image.get_width() for image in images.values()), default=1)
+        page_size = min(page_size, max(widest, int((area * 1.2) ** 0.5 + 63) // 64 * 64))
+        rects = {}
+        page_heights = [0]
+        x = y = shelf_height = 0
+        for key in order:
+            width, height = images[key].get_size()
+            if x + width > page_size:  # Étagère pleine
+                x, y = 0, y + shelf_height + padding
+                shelf_height = 0
+            if y + height > page_size:  # Page pleine
+                page_heights.append(0)
+                x = y = shelf_height = 0
+            rects[key] = (len(page_heights) - 1, pygame.Rect(x, y, width, height))
+            x += width + padding
+            shelf_height = max(shelf_height, height)
+            page_heights[-1] = max(page_heights[-1], y + height)
+        rects = {key: rects[key] for key in images}  # Index dans l'ordre des fichiers
+
+        # Pages coupées à la hauteur utilisée
+        pages = [pygame.Surface((page_size, max(1, height)), pygame.SRCALPHA).convert_alpha()
+                 for height in page_heights]
+        for key, (page, rect) in rects.items():
+            # Pages transparentes au départ : BLEND_RGBA_MAX recopie les pixels (alpha compris) tels quels
+            pages[page].blit(images[key], rect, special_flags=pygame.BLEND_RGBA_MAX)
+        return cls(pages, rects)
+
+    def save(self, directory, stamp):
+        """Pages en RGBA brut : pas de décodage au chargement, une simple lecture (c'est un cache, pas un asset livré)"""
+        os.makedirs(directory, exist_ok=True)
+        blobs = [pygame.image.tobytes(page, "RGBA") for page in self.pages]
+        with open(os.path.join(directory, "pages.bin"), "wb") as f:
+            for blob in blobs:
+                f.write(blob)
+        index = {"stamp": stamp,
+                 "pages": [[*page.get_size(), len(blob)] for page, blob in zip(self.pages, blobs)],
+                 "frames": {key: [page, *rect] for key, (page, rect) in self.rects.items()}}
+        with open(os.path.join(directory, "index.json"), "w") as f:
+            json.dump(index, f)
+
+    @classmethod
+    def load(cls, directory, stamp):
+        """Atlas sauvegardé, ou None s'il n'existe pas ou ne correspond plus aux PNG du dossier"""
+        try:
+            with open(os.path.join(directory, "index.json")) as f:
+                index = json.load(f)
+            if index.get("stamp") != stamp:
+                return None
+            pages = []
+            with open(os.path.join(directory, "pages.bin"), "rb") as f:
+                for width, height, length in index["pages"]:
+                    pixels = f.read(length)
+                    pages.append(pygame.image.frombytes(pixels, (width, height), "RGBA").convert_alpha())
+        except (OSError, ValueError, KeyError, pygame.error):
+            return None
+        rects = {key: (page, pygame.Rect(x, y, width, height))
+                 for key, (page, x, y, width, height) in index["frames"].items()}
+        return cls(pages, rects)
+
+    def get_memory_usage(self):
+        return sum(page.get_width() * page.get_height() * page.get_bytesize() for page in self.pages)
+
+
+def list_frame_files(folder):
+    """Chemins relatifs des PNG du dossier, dans l'ordre de parcours de load_animation_set"""
+    files = []
+    for root, _, names in os.walk(folder):
+        prefix = root[len(folder):].lstrip("/\\")
+        for name in sorted(names):
+            if name.endswith(".png"):
+                files.append(os.path.join(prefix, name))
+    return files
+
+
+def get_folder_stamp(folder, files):
+    """Empreinte des PNG (nom, taille, date) : un atlas sauvegardé n'est réutilisé que s'ils n'ont pas changé"""
+    digest = hashlib.sha1()
+    for path in files:
+        stat = os.stat(os.path.join(folder, path))
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def load_frame(path):
+    try:
+        return pygame.image.load(path).convert_alpha()
+    except (OSError, pygame.error) as e:
+        print(f"[Erreur image] {path} : {e}")
+        return pygame.Surface((16, 16), pygame.SRCALPHA)  # fallback vide
+
+
+def load_atlas(folder):
+    """Atlas des frames d'un dossier : en mémoire, sinon depuis le cache disque, sinon construit à partir des PNG"""
+    atlas = _atlases.get(folder)
+    if atlas is not None:
+        return atlas
+
+    files = list_frame_files(folder)
+    stamp = get_folder_stamp(folder, files)
+    # Un nom de dossier par ensemble d'animations, à plat dans le cache
+    cache_dir = os.path.join(ATLAS_CACHE_DIR, folder.strip("/\\").replace("/", "_").replace("\\", "_"))
+
+    atlas = SpriteAtlas.load(cache_dir, stamp)
+    if atlas is None:
+        atlas = SpriteAtlas.build({path: load_frame(os.path.join(folder, path)) for path in files})
+        try:
+            atlas.save(cache_dir, stamp)
+        except (OSError, pygame.error) as e:
+            print(f"[ATLAS] Impossible de sauvegarder {cache_dir} : {e}")
+        print(f"[ATLAS] {folder} : {len(files)} frames rangées dans {len(atlas.pages)} page(s), "
+              f"{atlas.get_memory_usage() / 1024:.1f} KB")
+
+    _atlases[folder] = atlas
+    return atlas
@@ -87,7 +87,7 @@ class Chainsaw(MeleeWeapon):
         player_angle = self.game.player.get_angle()
         enemy_hit = False
 
-        for enemy in self.game.enemies:
+        for enemy in self.game.level.enemy_hash.query_radius(player_x, player_y, hit_range):
             if not enemy.alive:
                 continue
 
@@ -75,7 +75,7 @@ class Fists(MeleeWeapon):
 
         enemy_hit = False
 
-        for enemy in self.game.enemies:
+        for enemy in self.game.level.enemy_hash.query_radius(player_pos[0], player_pos[1], hit_range):
             if not enemy.alive:
                 continue
 
@@ -25,18 +25,14 @@ class HitscanWeapon(WeaponBase, ABC):
         px, py = player.get_position()
         angle = player.get_angle()
 
-        # Calculate line end point
+        # Line direction
         dx = math.cos(angle)
         dy = math.sin(angle)
 
-        # Find actual end point (considering walls)
-        actual_end_x, actual_end_y = self._get_line_end_point(px, py, dx, dy)
-
-        # Check which enemies are hit by the line
+        # Check which enemies are hit by the line (walls between are checked by line of sight)
         currently_detected = set()
-        for enemy in enemies:
-            if enemy.alive and self._line_intersects_enemy(px, py, actual_end_x, actual_end_y, enemy):
-                currently_detected.add(id(enemy))
+        for enemy in self._get_enemies_on_line(px, py, dx, dy):
+            currently_detected.add(id(enemy))
 
         # Print messages for newly detected enemies
         newly_detected = currently_detected - self.last_detected_enemies
@@ -58,6 +54,15 @@ class HitscanWeapon(WeaponBase, ABC):
         return currently_detected
 
 
+    def _get_enemies_on_line(self, start_x, start_y, dx, dy):
+        """Alive enemies the line crosses with no wall between them and the shooter, nearest first"""
+        max_distance = min(self.range, 500)  # Same reach as _get_line_end_point
+        end_x, end_y = start_x + dx * max_distance, start_y + dy * max_distance
+        line_of_sight = self.game.level.line_of_sight
+        return [enemy for enemy in self.game.level.enemy_hash.query_segment(start_x, start_y, end_x, end_y)
+                if enemy.alive and self._line_intersects_enemy(start_x, start_y, end_x, end_y, enemy)
+                and line_of_sight.is_clear(start_x, start_y, enemy.x, enemy.y)]
+
     def _get_line_end_point(self, start_x, start_y, dx, dy):
         """Get the actual end point of the line, considering wall collisions"""
         step_size = 4.0  # Small steps for accurate collision detection
@@ -158,28 +163,21 @@ class HitscanWeapon(WeaponBase, ABC):
             dx = math.cos(shot_angle)
             dy = math.sin(shot_angle)
 
-            # Get line end point considering walls for THIS pellet
-            end_x, end_y = self._get_line_end_point(px, py, dx, dy)
             spread_degrees = math.degrees(shot_angle - base_angle)
             print(
-                f"[TRACE] Pellet {pellet_num + 1}: Line from ({px:.1f}, {py:.1f}) to ({end_x:.1f}, {end_y:.1f}) at angle {math.degrees(shot_angle):.1f}° (spread: {spread_degrees:+.1f}°)")
+                f"[TRACE] Pellet {pellet_num + 1}: Line from ({px:.1f}, {py:.1f}) at angle {math.degrees(shot_angle):.1f}° (spread: {spread_degrees:+.1f}°)")
 
             # Check for enemy hits along THIS pellet's line
             hit_enemy = None
             closest_distance = float('inf')
 
-            # Check each enemy for THIS specific pellet
-            for enemy in enemies:
-                if not enemy.alive:
-                    continue
-
+            # Check each enemy in sight along THIS specific pellet's line
+            for enemy in self._get_enemies_on_line(px, py, dx, dy):
                 enemy_distance = math.hypot(enemy.x - px, enemy.y - py)
-
-                if self._line_intersects_enemy(px, py, end_x, end_y, enemy):
-                    print(f"[INTERSECT] Pellet {pellet_num + 1} intersects with enemy at {enemy_distance:.1f}px")
-                    if enemy_distance < closest_distance:
-                        closest_distance = enemy_distance
-                        hit_enemy = enemy
+                print(f"[INTERSECT] Pellet {pellet_num + 1} intersects with enemy at {enemy_distance:.1f}px")
+                if enemy_distance < closest_distance:
+                    closest_distance = enemy_distance
+                    hit_enemy = enemy
 
             # Damage the closest enemy hit by THIS pellet
             if hit_enemy:
@@ -194,8 +192,10 @@ class HitscanWeapon(WeaponBase, ABC):
                 hit_enemy.take_damage(damage_to_deal)
 
                 self._create_hit_effect(hit_enemy.x, hit_enemy.y, is_enemy=True)
+                end_x, end_y = hit_enemy.x, hit_enemy.y
             else:
-                # Hit wall or nothing
+                # Hit wall or nothing: only a miss needs the wall impact point
+                end_x, end_y = self._get_line_end_point(px, py, dx, dy)
                 print(f"[MISS] Pellet {pellet_num + 1} hit wall/nothing at ({end_x:.1f}, {end_y:.1f})")
                 self._create_hit_effect(end_x, end_y)
 
@@ -47,7 +47,9 @@ class MeleeWeapon(WeaponBase, ABC):
         """Vérifie si un ennemi est touché par l'attaque de mêlée"""
         player_rect = self.game.player.rect
 
-        for enemy in self.game.enemies:
+        # Les hitbox de mêlée débordent jusqu'à 40 px autour d'un ennemi (ver de Pluton) :
+        # 32 px autour du joueur + le rayon de l'ennemi dans la grille suffisent
+        for enemy in self.game.level.enemy_hash.query_rect(player_rect.inflate(64, 64)):
             if not enemy.alive:
                 continue
 
@@ -2,6 +2,7 @@ import pygame as pg
 import math
 from effects.explosion import Explosion
 from weapons.projectiles.projectile import Projectile
+from engine.billboard import Billboard
 
 class BFGProjectile(Projectile):
     def __init__(self, game, x, y, angle, speed, damage, lifetime, splash_radius):
@@ -52,48 +53,27 @@ class BFGProjectile(Projectile):
 
         return True
 
-    def render(self, screen, raycaster):
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
         player = self.game.player
         px, py = player.get_position()
-        player_angle = player.get_angle()
 
         dx, dy = self.x - px, self.y - py
         dist = math.hypot(dx, dy)
 
         if dist == 0:
-            return
-
-        # Raycast inline pour bloquer si un mur est entre le joueur et le projectile
-        step = 2
-        t = 0
-        blocked = False
-        while t < dist:
-            x = px + dx / dist * t
-            y = py + dy / dist * t
-            if raycaster.level.is_blocked(x, y):
-                blocked = True
-                break
-            t += step
-
-        if blocked:
-            return
+            return None
 
-        # Angle relatif au joueur
-        rel_angle = math.atan2(dy, dx) - player_angle
-        rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
+        # Caché si un mur est entre le joueur et le projectile (ligne de vue en cache du niveau)
+        if not raycaster.level.line_of_sight.is_clear(px, py, self.x, self.y):
+            return None
 
-        if abs(rel_angle) > raycaster.fov / 2:
-            return
+        if not self.sprite:
+            return None
 
         # Projection écran
-        corrected_dist = dist * math.cos(rel_angle)
-        screen_x = int((0.5 + rel_angle / raycaster.fov) * screen.get_width())
-        size = int((1000 / (corrected_dist + 0.0001)) * raycaster.wall_height_scale * self.scale)
-
-        if self.sprite:
-            scaled = pg.transform.scale(self.sprite, (size, size))
-            screen_y = screen.get_height() // 2 - size // 2
-            screen.blit(scaled, (screen_x - size // 2, screen_y))
+        size = int((1000 / (depth + 0.0001)) * raycaster.wall_height_scale * self.scale)
+        screen_y = view_height // 2 - size // 2
+        return Billboard(self.sprite, screen_x - size // 2, screen_y, size, size, depth, margin=5)
 
     def _explode(self):
         frames = [
@@ -107,14 +87,14 @@ class BFGProjectile(Projectile):
 
         # Dégâts directs
         hit_enemy = None
-        for enemy in self.game.enemies:
+        for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.size):
             dist = math.hypot(self.x - enemy.x, self.y - enemy.y)
             if dist < enemy.size + self.size:
                 enemy.take_damage(self.damage)
                 hit_enemy = enemy
                 break
 
-        for enemy in self.game.enemies:
+        for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.splash_radius):
             if enemy is not hit_enemy and enemy.alive:
                 dist = math.hypot(self.x - enemy.x, self.y - enemy.y)
                 if dist < self.splash_radius:
@@ -2,13 +2,14 @@ import pygame as pg
 import math
 from weapons.projectiles.projectile import Projectile
 from effects.explosion import Explosion
+from engine.billboard import Billboard
 
 class Plasma(Projectile):
     def __init__(self, game, x, y, angle, speed, damage, lifetime, splash_damage, splash_radius, sprite):
         super().__init__(game, x, y, angle, speed, damage, lifetime, splash_damage, splash_radius, sprite)
 
     def update(self, delta_time):
-        for enemy in self.game.enemies:
+        for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.size):
             if enemy.alive and self._collides_with_entity(enemy):
                 enemy.take_damage(self.damage)
                 self._explode()
@@ -41,33 +42,19 @@ class Plasma(Projectile):
         self.game.effects.append(Explosion(self.x, self.y, frames, duration=0.3))
 
         # Dégâts directs
-        for enemy in self.game.enemies:
+        for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.size):
             dist = math.hypot(self.x - enemy.x, self.y - enemy.y)
             if dist < enemy.size + self.size:
                 enemy.take_damage(self.damage)
                 break
 
-    def render(self, screen, raycaster):
-        player = self.game.player
-        px, py = player.get_position()
-        player_angle = player.get_angle()
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
+        if not self.sprite:
+            return None
 
-        dx, dy = self.x - px, self.y - py
-        dist = math.hypot(dx, dy)
-        rel_angle = math.atan2(dy, dx) - player_angle
-        rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
-
-        if abs(rel_angle) > raycaster.fov / 2:
-            return
-
-        corrected_dist = dist * math.cos(rel_angle)
-        screen_x = int((0.5 + rel_angle / raycaster.fov) * screen.get_width())
-        size = int((1000 / (corrected_dist + 0.0001)) * raycaster.wall_height_scale)
-
-        if self.sprite:
-            scaled = pg.transform.scale(self.sprite, (size, size))
-            screen_y = screen.get_height() // 2 - size // 2
-            screen.blit(scaled, (screen_x - size // 2, screen_y))
+        size = int((1000 / (depth + 0.0001)) * raycaster.wall_height_scale)
+        screen_y = view_height // 2 - size // 2
+        return Billboard(self.sprite, screen_x - size // 2, screen_y, size, size, depth, margin=5)
 
     def _collides_with_entity(self, entity):
         if hasattr(entity, 'position'):
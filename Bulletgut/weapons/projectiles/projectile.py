@@ -1,5 +1,6 @@
 import pygame as pg
 import math
+from engine.billboard import Billboard
 
 class Projectile:
     def __init__(self, game, x, y, angle, speed, damage, lifetime, splash_damage, splash_radius, sprite):
@@ -61,7 +62,7 @@ class Projectile:
                     print(f"Erreur collision porte : {e}")
                     continue
 
-        for entity in self.game.enemies:
+        for entity in self.game.level.enemy_hash.query_radius(self.x, self.y, self.size):
             if hasattr(entity, "take_damage"):
                 dx, dy = entity.x - self.x, entity.y - self.y
                 if math.hypot(dx, dy) <= self.size:
@@ -74,7 +75,7 @@ class Projectile:
             hit_enemy.take_damage(self.damage)
 
         if self.splash_damage:
-            for enemy in self.game.enemies:
+            for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.splash_radius):
                 if enemy is hit_enemy:
                     continue
                 if hasattr(enemy, "take_damage"):
@@ -88,7 +89,7 @@ class Projectile:
         self.destroy()
 
     def _get_hit_enemy(self):
-        for enemy in self.game.enemies:
+        for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.size):
             if hasattr(enemy, "take_damage"):
                 dx, dy = enemy.x - self.x, enemy.y - self.y
                 if math.hypot(dx, dy) <= self.size:
@@ -96,18 +97,18 @@ class Projectile:
         return None
 
     def _has_line_of_sight(self, target):
-        return not self.game.raycaster.raycast_hits_wall(self.x, self.y, target.x, target.y)
+        return self.game.level.line_of_sight.is_clear(self.x, self.y, target.x, target.y)
 
     def _explode(self):
         if self.splash_damage:
-            for enemy in self.game.enemies:
+            for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.splash_radius):
                 ex, ey = enemy.x, enemy.y
                 distance = math.hypot(self.x - ex, self.y - ey)
                 if distance < self.splash_radius:
                     factor = 1.0 - (distance / self.splash_radius)
                     enemy.take_damage(int(self.damage * factor))
         else:
-            for enemy in self.game.enemies:
+            for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.size):
                 ex, ey = enemy.x, enemy.y
                 distance = math.hypot(self.x - ex, self.y - ey)
                 if distance < enemy.size + self.size:
@@ -119,32 +120,16 @@ class Projectile:
         # Implémentez ici votre système de particules ou effet d'explosion
         pass
 
-    def render(self, screen, raycaster):
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
+        """Sprite size and position in the 3D view, centered on the horizon"""
         if not self.sprite:
-            return
-
-        player = self.game.player
-        px, py = player.get_position()
-        player_angle = player.get_angle()
-        dx, dy = self.x - px, self.y - py
-        dist = math.hypot(dx, dy)
-        rel_angle = math.atan2(dy, dx) - player_angle
-        rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
-
-        corrected_dist = dist * math.cos(rel_angle)
-        screen_x = int((0.5 + rel_angle / raycaster.fov) * screen.get_width())
-
-        if abs(rel_angle) > raycaster.fov / 2:
-            return
-
-        if 0 <= screen_x < len(raycaster.z_buffer):
-            if corrected_dist > raycaster.z_buffer[screen_x] + 5:
-                return
-
-        size = int(1000 / (corrected_dist + 0.0001))
-        scaled_sprite = pg.transform.scale(self.sprite, (size, size))
-        screen_y = screen.get_height() // 2 - size // 2
-        screen.blit(scaled_sprite, (screen_x - size // 2, screen_y))
+            return None
+
+        size = int(1000 / (depth + 0.0001))
+        return Billboard(self.sprite, screen_x - size // 2, view_height // 2 - size // 2, size, size, depth, margin=5)
+
+    def render(self, screen, raycaster):
+        raycaster.render_billboards(screen, self.game.player, [self])
 
     def destroy(self):
         if self in self.game.projectiles:
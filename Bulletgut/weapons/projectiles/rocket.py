@@ -3,6 +3,7 @@ import math
 
 from effects.explosion import Explosion
 from weapons.projectiles.projectile import Projectile
+from engine.billboard import Billboard
 
 
 class Rocket(Projectile):
@@ -31,8 +32,8 @@ class Rocket(Projectile):
 
         self.position.update(self.x, self.y)
 
-        # Collision avec les ennemis
-        for enemy in self.game.enemies:
+        # Collision avec les ennemis proches
+        for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.size):
             if enemy.alive and self._collides_with_entity(enemy):
                 self.hit_enemy = enemy  # Stocker l'ennemi touché directement
                 self.on_impact()
@@ -40,32 +41,13 @@ class Rocket(Projectile):
 
         return True  # Toujours en vie
 
-    def render(self, screen, raycaster):
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
         if self.exploded:
-            return
-
-        dx = self.x - self.game.player.x
-        dy = self.y - self.game.player.y
-        dist = math.hypot(dx, dy)
-        rel_angle = math.atan2(dy, dx) - self.game.player.angle
-        rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
-
-        if abs(rel_angle) > raycaster.fov / 2:
-            return
-
-        screen_x = int((0.5 + rel_angle / raycaster.fov) * screen.get_width())
-        corrected_dist = dist * math.cos(rel_angle)
-
-        if 0 <= screen_x < len(raycaster.z_buffer):
-            if corrected_dist > raycaster.z_buffer[screen_x] + 5:
-                return
-
-        size = int(1000 / (corrected_dist + 0.0001))
-        screen_y = screen.get_height() // 2 - size // 2
+            return None
 
-        sprite = self.front_sprite
-        scaled_sprite = pg.transform.scale(sprite, (size, size))
-        screen.blit(scaled_sprite, (screen_x - size // 2, screen_y))
+        size = int(1000 / (depth + 0.0001))
+        screen_y = view_height // 2 - size // 2
+        return Billboard(self.front_sprite, screen_x - size // 2, screen_y, size, size, depth, margin=5)
 
     def on_impact(self):
         """Appelé quand la roquette entre en collision"""
@@ -108,8 +90,8 @@ class Rocket(Projectile):
             # Utiliser la méthode normale pour le joueur car il n'a pas les mêmes problèmes d'état
             self.game.player.take_damage(damage_to_player)
 
-        # Dégâts aux ennemis
-        for enemy in self.game.enemies:
+        # Dégâts aux ennemis dans le rayon
+        for enemy in self.game.level.enemy_hash.query_radius(self.x, self.y, self.splash_radius):
             if enemy.alive:
                 # Ne pas appliquer de splash damage à l'ennemi déjà touché directement
                 if enemy == self.hit_enemy:
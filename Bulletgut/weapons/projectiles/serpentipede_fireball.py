@@ -3,6 +3,7 @@ import pygame as pg
 from utils.assets import load_image
 from weapons.projectiles.projectile import Projectile
 from effects.explosion import Explosion
+from engine.billboard import Billboard
 
 class SerpentipedeFireball(Projectile):
     def __init__(self, game, x, y, angle, owner=None):
@@ -68,33 +69,15 @@ class SerpentipedeFireball(Projectile):
 
         return not self.exploded
 
-    def render(self, screen, raycaster):
+    def get_billboard(self, raycaster, depth, screen_x, view_height):
         if self.exploded:
-            return
+            return None
 
-        dx = self.x - self.game.player.x
-        dy = self.y - self.game.player.y
-        dist = math.hypot(dx, dy)
-        rel_angle = math.atan2(dy, dx) - self.game.player.angle
-        rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
-
-        if abs(rel_angle) > raycaster.fov / 2:
-            return
-
-        screen_x = int((0.5 + rel_angle / raycaster.fov) * screen.get_width())
-        corrected_dist = dist * math.cos(rel_angle)
-
-        if 0 <= screen_x < len(raycaster.z_buffer):
-            if corrected_dist > raycaster.z_buffer[screen_x] + 5:
-                return
-
-        size = int(1.5 * 4000 / (corrected_dist + 0.0001))
+        size = int(1.5 * 4000 / (depth + 0.0001))
         size = min(size, 200)  # Optionnel : éviter les tailles trop grandes
 
-        screen_y = screen.get_height() // 2 - size // 2
-
-        scaled_sprite = pg.transform.scale(self.sprite, (size, size))
-        screen.blit(scaled_sprite, (screen_x - size // 2, screen_y))
+        screen_y = view_height // 2 - size // 2
+        return Billboard(self.sprite, screen_x - size // 2, screen_y, size, size, depth, margin=5)
 
     def on_impact(self):
         if not self.exploded: